@@ -0,0 +1,144 @@
+#!/usr/bin/python
+"""
+Headless batch computation of spectra of many signal files.
+
+The spectra of fft_mfr.py (single-sided amplitude) and sunspots.py
+(periodogram) are computed for every input file in one process, and are
+written as CSV or NPY files. Only NumPy is imported; no display is needed.
+
+Input files are text tables (a column is the signal) or .npy arrays.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__revision__ = "1.0"
+
+import os
+import sys
+import getopt
+
+import numpy as np
+
+from fft_mfr import single_sided_amplitude
+from sunspots import periodogram, find_peaks
+
+
+SPECTRA = {
+    'amplitude': single_sided_amplitude,
+    'periodogram': periodogram,
+}
+
+
+def load_signal(path, column=-1):
+    """Return the signal in a .npy file or a column of a text table."""
+    if path.lower().endswith('.npy'):
+        y = np.load(path)
+    else:
+        y = np.loadtxt(path, ndmin=2)
+    if y.ndim == 2:
+        y = y[:, column]
+    return y
+
+
+def save_spectrum(path, f, s, format='csv'):
+    """Save a spectrum as a CSV of (freq, value) lines or as an NPY array of
+    2 rows, and return the output path.
+    """
+    out = '%s.%s' % (path, format)
+    if format == 'npy':
+        np.save(out, np.vstack((f, s)))
+    else:
+        np.savetxt(out, np.column_stack((f, s)), '%.10g', ',')
+    return out
+
+
+def process(paths, kind='amplitude', Fs=1., column=-1, format='csv',
+            outdir=None, pad=False, peaks=0):
+    """Compute and save the spectrum of every file.
+
+    Yield (output path, (freqs, values) of the highest peaks) per file; the
+    periodogram is zero-padded to the next power of 2 if pad.
+    """
+    spectrum = SPECTRA[kind]
+    for path in paths:
+        y = load_signal(path, column)
+        if kind == 'periodogram':
+            f, s = spectrum(y, Fs, pad)
+        else:
+            f, s = spectrum(y, Fs)
+        base = os.path.splitext(path)[0] + '.' + kind
+        if outdir:
+            base = os.path.join(outdir, os.path.basename(base))
+        yield save_spectrum(base, f, s, format), find_peaks(f, s, peaks)
+
+#------------------------------------------------------------------------------
+
+def usage():
+    print """\
+Usage: fft_batch [option] FILE...
+
+Option:
+    -k KIND, --kind=KIND    amplitude (the default) or periodogram.
+    -r FS, --rate=FS        the sampling rate (1 is the default).
+    -c N, --column=N        the column of text tables (the last by default).
+    -f FMT, --format=FMT    csv (the default) or npy.
+    -o DIR, --outdir=DIR    write spectra to DIR instead of beside inputs.
+    -z, --pad               zero-pad periodograms to the next power of 2.
+    -p K, --peaks=K         print the K highest peaks (interpolated) of every
+                            spectrum as freq, period and value.
+    -h, --help              show this help message and exit.
+
+Purpose:
+    Write the spectrum of every input file to <base>.<kind>.<fmt>."""
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "hk:r:c:f:o:zp:",
+                                   ["help", "kind=", "rate=", "column=",
+                                    "format=", "outdir=", "pad", "peaks="])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    if args == []:
+        usage()
+        return 0
+
+    kw = {}
+    for o, a in opts:
+        if o in ("-k", "--kind"):
+            if a not in SPECTRA:
+                usage()
+                return 2
+            kw['kind'] = a
+        elif o in ("-r", "--rate"):
+            kw['Fs'] = float(a)
+        elif o in ("-c", "--column"):
+            kw['column'] = int(a)
+        elif o in ("-f", "--format"):
+            kw['format'] = a.lower()
+        elif o in ("-o", "--outdir"):
+            kw['outdir'] = a
+        elif o in ("-z", "--pad"):
+            kw['pad'] = True
+        elif o in ("-p", "--peaks"):
+            kw['peaks'] = int(a)
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    for out, (freqs, values) in process(args, **kw):
+        print out
+        for f, v in zip(freqs, values):
+            print '    freq=%g period=%g value=%g' % (f, 1/f, v)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,8 @@ Note:
 This example is coded original in Matlab from Roger Jang's
 Audio Signal Processing page.  I translated it into Python with matplotlib.
 
+The computation needs only NumPy; matplotlib is imported when plotting.
+
 See Also:
 
 - "Discrete Fourier Transform" by Roger Jang
@@ -16,58 +18,232 @@ See Also:
 """
 __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
 __date__ = "December 2006"
-__revision__ = "1.1"
+__revision__ = "1.3"
+
+import numpy as np
 
-from pylab import *
 
+def _axis_slice(a, start, stop, axis):
+    """Return the view a[..., start:stop, ...] along an axis."""
+    index = [slice(None)] * a.ndim
+    index[axis] = slice(start, stop)
+    return a[tuple(index)]
 
-def fftshift(X):
+
+def _copy(dst, src):
+    """dst[...] = src for disjoint views of one array, without the temporary
+    copy NumPy makes when their memory bounds overlap: such views are copied
+    by subarrays along their first axis.
+    """
+    if dst.ndim <= 1 or not np.may_share_memory(dst, src):
+        dst[...] = src
+    else:
+        for d, s in zip(dst, src):
+            _copy(d, s)
+
+
+def roll(X, s, axis=-1, out=None, work=None):
+    """Rotate X by s points along an axis, i.e., Y[(i+s) % N] = X[i].
+
+    Arguments
+    ---------
+    X       the array to rotate
+    s       the shift
+    axis    the axis to rotate along; the other axes are batched, e.g., the
+            rows of a 2-D array of frames
+    out     the output array; a new array by default, or X itself to rotate
+            in place
+    work    a scratch array for in-place rotations, of the shape of X but
+            at least min(s, N-s) points along the axis; ceil(N/2) points
+            are allocated per call by default
+
+    Only two slice copies are made into a separate output. An in-place
+    rotation saves the smaller part, of at most N/2 points, into work and
+    moves the larger part within X block by block, so that NumPy makes no
+    temporary copies: blocks of the shift, which do not overlap their
+    destinations, are moved directly, or blocks of the rest of work through
+    it if that is larger. Direct moves of batched lanes interleaved in
+    memory go lane by lane; for many short lanes, give work N points.
+
+    Example
+    -------
+    >>> X = np.arange(5)
+    >>> roll(X, 2)
+    array([3, 4, 0, 1, 2])
+    >>> roll(X, -2, out=X) is X, X
+    (True, array([2, 3, 4, 0, 1]))
+    >>> def roll_in_place(N, s):
+    ...     X = np.arange(N)
+    ...     return roll(X, s, out=X).tolist()
+    >>> roll_in_place(5, 1), roll_in_place(5, 4)
+    ([4, 0, 1, 2, 3], [1, 2, 3, 4, 0])
+    >>> roll_in_place(8, 3), roll_in_place(8, 7)
+    ([5, 6, 7, 0, 1, 2, 3, 4], [1, 2, 3, 4, 5, 6, 7, 0])
+    >>> [roll_in_place(10, s) == np.roll(np.arange(10), s).tolist()
+    ...  for s in range(-10, 11)] == [True] * 21
+    True
+    >>> F = np.arange(21).reshape(3, 7).T
+    >>> roll(F, 3, 0, F).T.tolist()
+    [[4, 5, 6, 0, 1, 2, 3], [11, 12, 13, 7, 8, 9, 10], [18, 19, 20, 14, 15, 16, 17]]
+
+    An in-place rotation allocates nothing when work is given:
+
+    >>> import resource
+    >>> def max_rss():
+    ...     return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    >>> X = np.ones((4, 10**6)); work = np.ones((4, 10**6 / 2))
+    >>> rss = max_rss()
+    >>> fftshift(X, out=X, work=work) is X, roll(X, 3, out=X, work=work) is X
+    (True, True)
+    >>> Y = X.T
+    >>> roll(Y, -3, 0, Y, work.T) is Y
+    True
+    >>> (max_rss() - rss) * 1024 < work.nbytes / 8  # KB on Linux, B on Mac
+    True
+    """
+    X = np.asarray(X)
+    N = X.shape[axis]
+    if out is None:
+        out = np.empty_like(X)
+    s %= N or 1
+    k = N - s
+    if s == 0:
+        if out is not X:
+            out[...] = X
+        return out
+
+    if not np.may_share_memory(X, out):
+        _axis_slice(out, s, N, axis)[...] = _axis_slice(X, 0, k, axis)
+        _axis_slice(out, 0, s, axis)[...] = _axis_slice(X, k, N, axis)
+        return out
+
+    assert out is X, "out must be X itself or not overlap X"
+    if work is None:
+        shape = list(X.shape)
+        shape[axis] = N - N/2
+        work = np.empty(shape, X.dtype)
+    m = min(s, k)                       # the smaller part
+    W = work.shape[axis]
+    assert W >= m, "work must hold min(s, N-s) points along the axis"
+    w = _axis_slice(work, 0, m, axis)
+    bounce = _axis_slice(work, m, W, axis)
+    size = max(m, W - m)                # the points per block
+
+    def move(a, b, d):
+        """Move X[a:b] by d points along the axis."""
+        src = _axis_slice(X, a, b, axis)
+        dst = _axis_slice(X, a + d, b + d, axis)
+        if size > m:
+            t = _axis_slice(bounce, 0, b - a, axis)
+            t[...] = src
+            dst[...] = t
+        else:
+            _copy(dst, src)
+
+    if s <= k:
+        w[...] = _axis_slice(X, k, N, axis)
+        for b in xrange(k, 0, -size):   # backward for a move forward
+            move(max(b - size, 0), b, s)
+        _axis_slice(X, 0, s, axis)[...] = w
+    else:
+        w[...] = _axis_slice(X, 0, k, axis)
+        for a in xrange(k, N, size):
+            move(a, min(a + size, N), -k)
+        _axis_slice(X, s, N, axis)[...] = w
+    return X
+
+
+def fftshift(X, axis=-1, out=None, work=None):
     """Shift zero-frequency component to center of spectrum.
 
     Y = fftshift(X) rearranges the outputs of fft
     by moving the zero-frequency component to the center of the array.
+    It works on any length (the zero frequency goes to N/2), along any axis,
+    and in place or into a given output; see roll for out and work.
+
+    Example
+    -------
+    >>> fftshift(np.arange(4)), fftshift(np.arange(5))
+    (array([2, 3, 0, 1]), array([3, 4, 0, 1, 2]))
+    >>> frames = np.arange(6).reshape(2, 3)
+    >>> fftshift(frames, out=frames) is frames, frames
+    (True, array([[2, 0, 1],
+           [5, 3, 4]]))
+    """
+    return roll(X, np.shape(X)[axis]/2, axis, out, work)
+
+
+def ifftshift(X, axis=-1, out=None, work=None):
+    """The inverse of fftshift.
+
+    Example
+    -------
+    >>> X = np.random.randn(3, 7)
+    >>> np.array_equal(ifftshift(fftshift(X, axis=1), axis=1), X)
+    True
+    """
+    return roll(X, -(np.shape(X)[axis]/2), axis, out, work)
+
+
+def sine_spectrum(N=256, Fs=8000., k=10):
+    """Return (t, y, freq, Y): a cosine wave of k frequency steps and its
+    bilateral spectrum with the zero frequency in the middle.
+
+    Arguments
+    ---------
+    N   the number of points
+    Fs  the sampling rate
+    k   the frequency of the wave in frequency steps (Fs/N)
+
+    Example
+    -------
+    >>> t, y, freq, Y = sine_spectrum(256, 8000., 10)
+    >>> sorted(freq[abs(Y) > 1])
+    [-312.5, 312.5]
     """
-    Y = X.copy()
-    Y[:N/2], Y[N/2:] = X[N/2:], X[:N/2]
-    return Y
-
-
-N = 256             # the number of points
-Fs = 8000.          # the sampling rate
-Ts = 1./Fs          # the sampling period
-freqStep = Fs/N     # resolution of the frequency in frequency domain
-f = 10*freqStep     # frequency of the sine wave; folded by integer freqStep
-t = arange(N)*Ts    # x ticks in time domain, t = n*Ts
-y = cos(2*pi*f*t)   # Signal to analyze
-Y = fft(y)          # Spectrum
-Y = fftshift(Y)     # middles the zero-point's axis
-
-figure(figsize=(8,8))
-subplots_adjust(hspace=.4)
-
-# Plot time data
-subplot(3,1,1)
-plot(t, y, '.-')
-grid("on")
-xlabel('Time (seconds)')
-ylabel('Amplitude')
-title('Sinusoidal signals')
-axis('tight')
-
-freq = freqStep * arange(-N/2, N/2)  # x ticks in frequency domain
-
-# Plot spectral magnitude
-subplot(3,1,2)
-plot(freq, abs(Y), '.-b')
-grid("on")
-xlabel('Frequency')
-ylabel('Magnitude (Linear)')
-
-# Plot phase
-subplot(3,1,3)
-plot(freq, angle(Y), '.-b')
-grid("on")
-xlabel('Frequency')
-ylabel('Phase (Radian)')
-
-show()
+    Ts = 1./Fs          # the sampling period
+    freqStep = Fs/N     # resolution of the frequency in frequency domain
+    f = k*freqStep      # frequency of the sine wave; folded by integer freqStep
+    t = np.arange(N)*Ts # x ticks in time domain, t = n*Ts
+    y = np.cos(2*np.pi*f*t) # Signal to analyze
+    Y = np.fft.fft(y)   # Spectrum
+    Y = fftshift(Y)     # middles the zero-point's axis
+    freq = freqStep * np.arange(-N/2, N/2)  # x ticks in frequency domain
+    return t, y, freq, Y
+
+
+def plot(t, y, freq, Y):
+    """Plot the signal, and the magnitude and phase of its spectrum."""
+    import pylab as pl
+
+    pl.figure(figsize=(8,8))
+    pl.subplots_adjust(hspace=.4)
+
+    # Plot time data
+    pl.subplot(3,1,1)
+    pl.plot(t, y, '.-')
+    pl.grid("on")
+    pl.xlabel('Time (seconds)')
+    pl.ylabel('Amplitude')
+    pl.title('Sinusoidal signals')
+    pl.axis('tight')
+
+    # Plot spectral magnitude
+    pl.subplot(3,1,2)
+    pl.plot(freq, abs(Y), '.-b')
+    pl.grid("on")
+    pl.xlabel('Frequency')
+    pl.ylabel('Magnitude (Linear)')
+
+    # Plot phase
+    pl.subplot(3,1,3)
+    pl.plot(freq, np.angle(Y), '.-b')
+    pl.grid("on")
+    pl.xlabel('Frequency')
+    pl.ylabel('Phase (Radian)')
+
+
+if __name__ == "__main__":
+    import pylab
+    plot(*sine_spectrum())
+    pylab.show()
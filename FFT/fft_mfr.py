@@ -10,6 +10,8 @@ Note:
 This example is original from Matlab Funcion Reference.
 I translated it into Python with matplotlib.
 
+The computation needs only NumPy; matplotlib is imported when plotting.
+
 See Also:
 
 - Matlab function reference of FFT
@@ -17,40 +19,78 @@ See Also:
 """
 __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
 __date__ = "December 2006"
-__revision__ = "1.1"
+__revision__ = "1.2"
+
+import numpy as np
 
-from pylab import *
 
 def nextpow2(A):
-    return int(ceil(log2(A)))
+    """Return the exponent of the next power of 2 from A.
+
+    Example
+    -------
+    >>> nextpow2(1000), nextpow2(1024)
+    (10, 10)
+    """
+    return int(np.ceil(np.log2(A)))
+
+
+def noisy_signal(Fs=1000., N=1000, seed=None):
+    """Return (t, y): the sum of a 50 Hz sinusoid and a 120 Hz sinusoid plus
+    noise, of N points sampled at Fs.
+    """
+    Ts = 1/Fs           # Sample period
+    t = np.arange(N)*Ts # Time vector
+
+    # Sum of a 50 Hz sinusoid and a 120 Hz sinusoid
+    x = 0.7*np.sin(2*np.pi*50*t) + np.sin(2*np.pi*120*t)
+    y = x + 2*np.random.RandomState(seed).randn(N)  # Sinusoids plus noise
+    return t, y
+
+
+def single_sided_amplitude(y, Fs=1., NFFT=None):
+    """Return (f, amplitude): the single-sided amplitude spectrum of y.
+
+    The FFT is zero-padded to the next power of 2 from len(y) by default.
 
+    Example
+    -------
+    >>> t, y = noisy_signal(1000., 1000, seed=0)
+    >>> f, a = single_sided_amplitude(y, 1000.)
+    >>> len(f), [int(round(x)) for x in sorted(f[a.argsort()[-2:]])]
+    (513, [50, 120])
+    """
+    N = len(y)
+    if NFFT is None:
+        NFFT = 2**nextpow2(N)   # Next power of 2 from length of y
+    Y = np.fft.rfft(y, NFFT)/N
+    f = Fs/2 * np.linspace(0, 1, NFFT/2 + 1)
+    return f, 2*abs(Y[:NFFT/2 + 1])
 
-Fs = 1000.          # Sampling frequency
-Ts = 1/Fs           # Sample period
-N = 1000            # Length of signal
-t = arange(N)*Ts    # Time vector
 
-# Sum of a 50 Hz sinusoid and a 120 Hz sinusoid
-x = 0.7*sin(2*pi*50*t) + sin(2*pi*120*t)
-y = x + 2*randn(size(t))     # Sinusoids plus noise
+def plot(t, y, f, a):
+    """Plot the noisy signal and its single-sided amplitude spectrum."""
+    import pylab as pl
 
-figure(figsize=(7,8), frameon=False)
-subplots_adjust(hspace=.4)
+    pl.figure(figsize=(7,8), frameon=False)
+    pl.subplots_adjust(hspace=.4)
 
-subplot(211)
-plot(1000*t[:50], y[:50])
-title('Signal Corrupted with Zero-Mean Random Noise')
-xlabel('Time, t (ms)')
-ylabel('Amplitude, y(t)')
+    pl.subplot(211)
+    pl.plot(1000*t[:50], y[:50])
+    pl.title('Signal Corrupted with Zero-Mean Random Noise')
+    pl.xlabel('Time, t (ms)')
+    pl.ylabel('Amplitude, y(t)')
 
-NFFT = 2**nextpow2(N)  # Next power of 2 from length of y
-Y = fft(y, NFFT)/N
-f = Fs/2 * linspace(0, 1, NFFT/2)
+    pl.subplot(212)
+    pl.plot(f, a)   # Plot single-sided amplitude spectrum.
+    pl.title('Single-Sided Amplitude Spectrum of y(t)')
+    pl.xlabel('Frequency, f (Hz)')
+    pl.ylabel('Magnitude, |Y(f)|')
 
-subplot(212)
-plot(f, 2*abs(Y[:NFFT/2]))  # Plot single-sided amplitude spectrum.
-title('Single-Sided Amplitude Spectrum of y(t)')
-xlabel('Frequency, f (Hz)')
-ylabel('Magnitude, |Y(f)|')
 
-show()
+if __name__ == "__main__":
+    import pylab
+    Fs = 1000.
+    t, y = noisy_signal(Fs)
+    plot(t, y, *single_sided_amplitude(y, Fs))
+    pylab.show()
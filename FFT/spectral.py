@@ -0,0 +1,357 @@
+#!/usr/bin/python
+"""
+Streaming spectral analysis: Welch PSD, STFT/spectrogram and overlap-add.
+
+Unlike the one-shot fft(y) of the demos, a signal is streamed in chunks from
+an array, a raw file or a WAV file, and is cut into overlapped frames across
+chunk boundaries. The window, its normalizations and the work buffers are
+made once per analyzer and reused for every batch of frames; frames of a
+batch are views of the chunk buffer and are transformed with one FFT call.
+
+Note:
+
+NumPy has no FFT plan objects, but it caches the twiddle factors of the last
+FFT sizes, so a fixed frame size is what makes the "plan" reusable.
+
+See Also:
+
+- P. Welch, "The use of fast Fourier transform for the estimation of power
+  spectra", IEEE Trans. Audio Electroacoust. 15 (2): 70-73, 1967.
+- scipy.signal.welch, scipy.signal.stft
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__revision__ = "1.0"
+
+import sys
+import wave
+import getopt
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+#------------------------------------------------------------------------------
+# Signal sources
+#------------------------------------------------------------------------------
+
+def iter_array(y, chunk=1<<16):
+    """Yield chunks of an in-memory signal (views, no copy)."""
+    for a in xrange(0, len(y), chunk):
+        yield y[a:a+chunk]
+
+
+def iter_raw(path, dtype='<i2', channels=1, channel=0, chunk=1<<16):
+    """Yield float chunks of a channel of a raw interleaved sample file."""
+    dtype = np.dtype(dtype)
+    f = open(path, 'rb')
+    while True:
+        data = np.fromfile(f, dtype, chunk * channels)
+        if not len(data):
+            break
+        yield data[channel::channels].astype(float)
+    f.close()
+
+
+def open_wav(path, channel=0, chunk=1<<16):
+    """Return (sampling rate, iterator of float chunks) of a channel of a
+    PCM WAV file.
+    """
+    w = wave.open(path, 'rb')
+    fs = w.getframerate()
+    channels = w.getnchannels()
+    width = w.getsampwidth()
+    dtype = {1: np.uint8, 2: '<i2', 4: '<i4'}[width]
+
+    def chunks():
+        while True:
+            data = w.readframes(chunk)
+            if not data:
+                break
+            y = np.frombuffer(data, dtype)[channel::channels].astype(float)
+            if width == 1:
+                y -= 128
+            yield y
+        w.close()
+
+    return fs, chunks()
+
+#------------------------------------------------------------------------------
+# Analyzer
+#------------------------------------------------------------------------------
+
+def get_window(window, n):
+    """Return a periodic window of n points by name, or the window itself.
+
+    Example
+    -------
+    >>> get_window('hann', 4)
+    array([0. , 0.5, 1. , 0.5])
+    """
+    if not isinstance(window, basestring):
+        w = np.asarray(window, float)
+        assert len(w) == n, "window length must be nperseg"
+        return w
+    k = np.arange(n)
+    if window in ('hann', 'hanning'):
+        return 0.5 - 0.5*np.cos(2*np.pi*k/n)
+    if window == 'hamming':
+        return 0.54 - 0.46*np.cos(2*np.pi*k/n)
+    if window in ('boxcar', 'rect'):
+        return np.ones(n)
+    raise ValueError('unknown window: %s' % window)
+
+
+class SpectralAnalyzer(object):
+    """Frame-based spectral analyzer of streamed signals.
+
+    Arguments
+    ---------
+    nperseg
+        the number of points per frame (the FFT size)
+    noverlap
+        the number of overlapped points between frames; nperseg/2 by default
+    window
+        a window name ('hann', 'hamming', 'boxcar') or an array
+    fs
+        the sampling rate
+    batch
+        the max. number of frames per FFT call
+
+    Example
+    -------
+    >>> sa = SpectralAnalyzer(8, 4, fs=8.)
+    >>> sa.freqs
+    array([0., 1., 2., 3., 4.])
+    >>> [len(f) for f in sa.frames(iter_array(np.arange(20.), 7))]
+    [2, 2]
+    """
+
+    def __init__(self, nperseg=256, noverlap=None, window='hann', fs=1.,
+                 batch=64):
+        if noverlap is None:
+            noverlap = nperseg / 2
+        assert 0 <= noverlap < nperseg
+        self.nperseg = nperseg
+        self.hop = nperseg - noverlap
+        self.fs = float(fs)
+        self.batch = batch
+        self.window = get_window(window, nperseg)
+        self.freqs = np.arange(nperseg/2 + 1) * self.fs / nperseg
+        # PSD scaling (density) of one-sided spectra
+        self._scale = np.empty(len(self.freqs))
+        self._scale[:] = 2. / (self.fs * (self.window**2).sum())
+        self._scale[0] /= 2
+        if nperseg % 2 == 0:
+            self._scale[-1] /= 2
+        self._work = np.empty((batch, nperseg))
+
+    def frames(self, chunks):
+        """Yield batches (2-D views) of overlapped frames of chunks; the
+        remainders of chunks are carried to the next chunk.
+        """
+        n, hop = self.nperseg, self.hop
+        rest = np.zeros(0)
+        for chunk in chunks:
+            buf = np.concatenate((rest, chunk)) if len(rest) else \
+                  np.asarray(chunk, float)
+            m = (len(buf) - n) / hop + 1 if len(buf) >= n else 0
+            if m > 0:
+                s = buf.strides[0]
+                frames = as_strided(buf, shape=(m, n), strides=(hop*s, s))
+                for i in xrange(0, m, self.batch):
+                    yield frames[i:i+self.batch]
+            rest = buf[m*hop:]
+
+    def _windowed(self, frames, detrend=False):
+        """Return windowed frames in the work buffer."""
+        w = self._work[:len(frames)]
+        if detrend:
+            np.subtract(frames, frames.mean(axis=1)[:, np.newaxis], out=w)
+            w *= self.window
+        else:
+            np.multiply(frames, self.window, out=w)
+        return w
+
+    def stft(self, chunks, detrend=False):
+        """Yield batches of one-sided spectra (frames x freqs)."""
+        for frames in self.frames(chunks):
+            yield np.fft.rfft(self._windowed(frames, detrend), axis=1)
+
+    def welch(self, chunks, detrend=True):
+        """Return (freqs, PSD) of chunks by Welch's method.
+
+        The PSD is averaged over frames on the fly, so it takes O(nperseg)
+        memory for any length of signal.
+
+        Example
+        -------
+        >>> fs, N = 1000., 1 << 14
+        >>> t = np.arange(N) / fs
+        >>> y = np.sin(2*np.pi*125*t) + 0.01*np.random.randn(N)
+        >>> f, p = SpectralAnalyzer(256, fs=fs).welch(iter_array(y, 1000))
+        >>> f[p.argmax()]
+        125.0
+        """
+        acc = np.zeros(len(self.freqs))
+        count = 0
+        for X in self.stft(chunks, detrend):
+            acc += (X.real**2 + X.imag**2).sum(axis=0)
+            count += len(X)
+        return self.freqs, acc * self._scale / max(count, 1)
+
+    def spectrogram(self, chunks, length=None, detrend=True):
+        """Return (freqs, times, PSD of frames x freqs) of chunks.
+
+        If the length of the signal is given, the output is preallocated;
+        otherwise batches are stacked at the end.
+        """
+        batches = []
+        out = None
+        if length is not None:
+            m = max((length - self.nperseg) / self.hop + 1, 0)
+            out = np.empty((m, len(self.freqs)))
+        i = 0
+        for X in self.stft(chunks, detrend):
+            k = len(X)
+            if out is not None:
+                P = out[i:i+k]
+                np.multiply(X.real, X.real, out=P)
+                P += X.imag**2
+            else:
+                P = X.real**2 + X.imag**2
+                batches.append(P)
+            P *= self._scale
+            i += k
+        if out is None:
+            out = np.vstack(batches) if batches else \
+                  np.empty((0, len(self.freqs)))
+        else:
+            out = out[:i]
+        times = (np.arange(len(out)) * self.hop + self.nperseg/2.) / self.fs
+        return self.freqs, times, out
+
+    def overlap_add(self, spectra):
+        """Yield the signal chunks synthesized from batches of one-sided
+        spectra by weighted overlap-add, i.e., the inverse of stft.
+
+        Each output chunk holds the samples completed by a batch; the last
+        nperseg-hop samples are flushed at the end.
+
+        Example
+        -------
+        >>> sa = SpectralAnalyzer(16, 12)
+        >>> y = np.random.randn(200)
+        >>> z = np.concatenate(list(sa.overlap_add(sa.stft(iter_array(y, 37)))))
+        >>> len(z), np.allclose(z[16:-16], y[16:len(z)-16])
+        (200, True)
+        """
+        n, hop, w = self.nperseg, self.hop, self.window
+        num = np.zeros(n)           # overlapped sums of frames
+        den = np.zeros(n)           # overlapped sums of window**2
+        w2 = w**2
+        for X in spectra:
+            frames = np.fft.irfft(X, n, axis=1)
+            frames *= w
+            out = np.empty(len(frames) * hop)
+            for j, frame in enumerate(frames):
+                num += frame
+                den += w2
+                d = den[:hop]
+                out[j*hop:(j+1)*hop] = num[:hop] / np.where(d > 1e-10, d, 1.)
+                num[:-hop] = num[hop:]
+                num[-hop:] = 0
+                den[:-hop] = den[hop:]
+                den[-hop:] = 0
+            yield out
+        d = den[:n-hop]
+        yield num[:n-hop] / np.where(d > 1e-10, d, 1.)
+
+    def process(self, chunks, func):
+        """Yield chunks of a signal filtered in the frequency domain, i.e.,
+        overlap-add of func(spectra) for batches of STFT spectra.
+        """
+        return self.overlap_add(func(X) for X in self.stft(chunks))
+
+#------------------------------------------------------------------------------
+
+def usage():
+    print """\
+Usage: spectral [option] FILE
+
+Option:
+    -n N, --nperseg=N   points per frame (256 is the default).
+    -o N, --noverlap=N  overlapped points (nperseg/2 is the default).
+    -w W, --window=W    hann (the default), hamming or boxcar.
+    -r FS, --rate=FS    the sampling rate of a raw file (1 is the default).
+    -t T, --dtype=T     the sample type of a raw file, e.g., <i2 (the
+                        default), <f4.
+    -c N, --channels=N  the channels of a raw file (1 is the default).
+    -s, --spectrogram   output the spectrogram instead of the Welch PSD.
+    -h, --help          show this help message and exit.
+
+Purpose:
+    Print the Welch PSD (freq,psd lines) or the spectrogram (time, then psd
+    of freqs per line) of a WAV (*.wav) or raw file as CSV."""
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "hn:o:w:r:t:c:s",
+                                   ["help", "nperseg=", "noverlap=", "window=",
+                                    "rate=", "dtype=", "channels=",
+                                    "spectrogram"])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    if len(args) != 1:
+        usage()
+        return 0
+
+    kw = {}
+    fs, dtype, channels, spectrogram = 1., '<i2', 1, False
+    for o, a in opts:
+        if o in ("-n", "--nperseg"):
+            kw['nperseg'] = int(a)
+        elif o in ("-o", "--noverlap"):
+            kw['noverlap'] = int(a)
+        elif o in ("-w", "--window"):
+            kw['window'] = a
+        elif o in ("-r", "--rate"):
+            fs = float(a)
+        elif o in ("-t", "--dtype"):
+            dtype = a
+        elif o in ("-c", "--channels"):
+            channels = int(a)
+        elif o in ("-s", "--spectrogram"):
+            spectrogram = True
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    path = args[0]
+    if path.lower().endswith('.wav'):
+        fs, chunks = open_wav(path)
+    else:
+        chunks = iter_raw(path, dtype, channels)
+    sa = SpectralAnalyzer(fs=fs, **kw)
+    if spectrogram:
+        f, t, S = sa.spectrogram(chunks)
+        for ti, row in zip(t, S):
+            print ','.join(['%g' % ti] + ['%g' % v for v in row])
+    else:
+        f, p = sa.welch(chunks)
+        for fi, v in zip(f, p):
+            print '%g,%g' % (fi, v)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
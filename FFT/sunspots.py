@@ -13,6 +13,8 @@ Note:
 This demonstration is original from both Anders Andreasen's and Mathworks' page.
 I translated it into Python with matplotlib.
 
+The computation needs only NumPy; matplotlib is imported when plotting.
+
 See also:
 
 - "Python for scientific use, Part II: Data analysis" by Anders Andreasen
@@ -22,57 +24,155 @@ See also:
 """
 __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
 __date__ = "December 2006"
-__revision__ = "1.3"
-
-
-import scipy.io.array_import
-from pylab import *
-
-
-figure(figsize=(13,4.5))
-
-subplot(121)
-sunspot = scipy.io.array_import.read_array('sunspots.dat')
-year = sunspot[:,0]
-wolfer = sunspot[:,1]
-plot(year, wolfer, "r+-")
-xlabel('Year')
-ylabel('Wolfer number')
-title('Sunspot data')
-
-subplot(122)
-Y = fft(wolfer)
-plot(Y.real, Y.imag, "ro")
-xlabel('Real Axis')
-ylabel('Imaginary Axis')
-title('Fourier Coefficients in the Complex Plane')
-xlim(-4000, 2000)
-
-
-figure(figsize=(13,4.5))
-
-subplot(121)
-N = len(Y)
-power = abs(Y[:(N/2)])**2
-Fs = 1.
-nyquist = Fs/2
-freq = linspace(0,1,N/2)*nyquist
-plot(freq[1:], power[1:])
-xlabel('Frequency (Cycles/Year)')
-ylabel('Power')
-title("Spectrum")
-xlim(0, 0.20)
-
-subplot(122)
-period = 1./freq
-plot(period[1:], power[1:])
-index = find(power==max(power[1:]))
-plot(period[index], power[index], 'ro')
-text(float(period[index])+1, float(power[index])*.95,
-                             'Period=%3.4f'%period[index])
-xlabel('Period (Years/Cycle)')
-ylabel('Power')
-title("Periodogram")
-xlim(0, 40)
-
-show()
+__revision__ = "1.5"
+
+import os
+
+import numpy as np
+
+from fft_mfr import nextpow2
+
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sunspots.dat')
+
+
+def load(path=DATA):
+    """Return (year, wolfer) arrays of a sunspot data file.
+
+    Example
+    -------
+    >>> year, wolfer = load()
+    >>> year[0], wolfer[0]
+    (1700.0, 5.0)
+    """
+    sunspot = np.loadtxt(path)
+    return sunspot[:,0], sunspot[:,1]
+
+
+def periodogram(y, Fs=1., pad=False):
+    """Return (freq, power) of the positive frequencies of y.
+
+    Arguments
+    ---------
+    y       the signal
+    Fs      the sampling rate
+    pad     zero-pad the FFT to the next power of 2 from len(y)
+
+    Example
+    -------
+    >>> f, p = periodogram([0, 1, 0, -1] * 4)
+    >>> f[p.argmax()]
+    0.25
+    >>> len(periodogram(range(1000), pad=True)[0])
+    512
+    """
+    N = len(y)
+    NFFT = 2**nextpow2(N) if pad else N
+    Y = np.fft.rfft(y, NFFT)[:(NFFT/2)]     # a real FFT of half the work
+    power = Y.real**2 + Y.imag**2
+    freq = np.arange(NFFT/2) * float(Fs) / NFFT
+    return freq, power
+
+
+def find_peaks(freq, power, k=1):
+    """Return (freqs, powers) of the k highest peaks of a spectrum, highest
+    first.
+
+    Peaks are the inner local maxima, so never the DC bin, refined by
+    parabolic interpolation of each with its neighbors; all are found in
+    one vectorized pass, and only the k highest are sorted.
+
+    Example
+    -------
+    >>> year, wolfer = load()
+    >>> f, p = find_peaks(*periodogram(wolfer), k=2)
+    >>> [round(1/x, 1) for x in f]
+    [10.8, 103.9]
+    >>> n = np.arange(4096)
+    >>> f, p = find_peaks(*periodogram(np.cos(2*np.pi*0.1003*n)))
+    >>> round(f[0], 4)
+    0.1003
+    >>> f, p = find_peaks(np.arange(5.), np.array([1., 5., 1., 0., 2.]))
+    >>> f.tolist(), p.tolist()
+    ([1.0], [5.0])
+    """
+    p = np.asarray(power)
+    if len(p) < 3:
+        return np.zeros(0), np.zeros(0)
+    a, b, c = p[:-2], p[1:-1], p[2:]
+    i = np.flatnonzero((b > a) & (b >= c))
+    if len(i) > k:
+        i = i[np.argpartition(-b[i], k-1)[:k]]
+    i = i[np.argsort(-b[i])]
+
+    a, b, c = a[i], b[i], c[i]
+    d = a - 2*b + c
+    delta = np.where(d != 0, 0.5*(a - c)/np.where(d != 0, d, 1), 0)
+    df = freq[1] - freq[0]
+    return freq[i+1] + delta*df, b - 0.25*(a - c)*delta
+
+
+def peak_period(freq, power):
+    """Return (period, power) of the peak of a periodogram, skipping the DC
+    component.
+
+    Example
+    -------
+    >>> year, wolfer = load()
+    >>> period, p = peak_period(*periodogram(wolfer))
+    >>> round(period, 1)
+    10.9
+    """
+    index = 1 + np.argmax(power[1:])
+    return 1./freq[index], power[index]
+
+
+def plot(year, wolfer):
+    """Plot the sunspot data, its Fourier coefficients, spectrum and
+    periodogram.
+    """
+    import pylab as pl
+
+    pl.figure(figsize=(13,4.5))
+
+    pl.subplot(121)
+    pl.plot(year, wolfer, "r+-")
+    pl.xlabel('Year')
+    pl.ylabel('Wolfer number')
+    pl.title('Sunspot data')
+
+    pl.subplot(122)
+    Y = np.fft.fft(wolfer)
+    pl.plot(Y.real, Y.imag, "ro")
+    pl.xlabel('Real Axis')
+    pl.ylabel('Imaginary Axis')
+    pl.title('Fourier Coefficients in the Complex Plane')
+    pl.xlim(-4000, 2000)
+
+
+    pl.figure(figsize=(13,4.5))
+
+    pl.subplot(121)
+    freq, power = periodogram(wolfer)
+    pl.plot(freq[1:], power[1:])
+    pl.xlabel('Frequency (Cycles/Year)')
+    pl.ylabel('Power')
+    pl.title("Spectrum")
+    pl.xlim(0, 0.20)
+
+    pl.subplot(122)
+    period = 1./freq[1:]
+    pl.plot(period, power[1:])
+    peak, peak_power = peak_period(freq, power)
+    pl.plot(peak, peak_power, 'ro')
+    pl.text(peak+1, peak_power*.95, 'Period=%3.4f'%peak)
+    pl.xlabel('Period (Years/Cycle)')
+    pl.ylabel('Power')
+    pl.title("Periodogram")
+    pl.xlim(0, 40)
+
+
+if __name__ == "__main__":
+    import pylab
+    plot(*load())
+    pylab.show()
@@ -63,6 +63,200 @@ def gen1_2(n):
     return L
 
 
+#------------------------------------------------------------------------------
+# Lazy k-mers on 2-bit packed integers
+#------------------------------------------------------------------------------
+# A k-mer is packed into an integer with 2 bits per base in the order of decode:
+# the 1st base is the least significant one.
+
+from array import array
+
+CODE = dict((c, i) for i, c in enumerate('ATCG'))
+
+_QUAD = [decode(x, 4) for x in xrange(256)]    # 4 bases per byte
+
+
+def rank(kmer):
+    """Return the index of a k-mer, i.e., the inverse of decode.
+
+    Example
+    -------
+    >>> rank('ATCG'), rank('TA')
+    (228, 1)
+    >>> all(rank(decode(x, 5)) == x for x in xrange(4**5))
+    True
+    """
+    x = 0
+    for c in reversed(kmer):
+        x = (x << 2) | CODE[c]
+    return x
+
+
+def unrank(x, k):
+    """Return the k-mer of an index; the same as decode(x, k) but decodes
+    4 bases at a time.
+
+    Example
+    -------
+    >>> unrank(228, 4), unrank(1, 2)
+    ('ATCG', 'TA')
+    >>> all(unrank(x, 5) == decode(x, 5) for x in xrange(4**5))
+    True
+    """
+    return ''.join([_QUAD[(x >> i) & 0xFF] for i in xrange(0, 2*k, 8)])[:k]
+
+
+def iter_kmers(n):
+    """Lazily yield all k-mers of n bases in the order of gen2.
+
+    Example
+    -------
+    >>> list(iter_kmers(2)) == gen2(2)
+    True
+    """
+    for x in xrange(4**n):
+        yield unrank(x, n)
+
+
+def _typecode(k):
+    """Return the array typecode that holds a packed k-mer."""
+    for t in 'BHIL':
+        if array(t).itemsize * 8 >= 2*k:
+            return t
+    raise ValueError('%u-mers do not fit in an array item' % k)
+
+
+def iter_packed(n, size=1<<16):
+    """Lazily yield all k-mers of n bases as packed integers, in arrays of
+    at most size items.
+
+    Example
+    -------
+    >>> [list(a) for a in iter_packed(1, 3)]
+    [[0, 1, 2], [3]]
+    """
+    t = _typecode(n)
+    N = 4**n
+    for a in xrange(0, N, size):
+        yield array(t, xrange(a, min(a + size, N)))
+
+
+def count_kmers(stream, k):
+    """Count the k-mers in a DNA stream and return a dense counter array of
+    4**k items, indexed with rank.
+
+    Arguments
+    ---------
+    stream
+        an iterable of sequence chunks, e.g., a file; line breaks are
+        skipped, other bases than ATCG (e.g., N) break k-mers, and lower
+        cases are accepted.
+    k
+        the number of bases of a k-mer
+
+    Example
+    -------
+    >>> counts = count_kmers(['ATC', 'GA\\n', 'tcNAT'], 2)
+    >>> sorted((unrank(x, 2), int(c)) for x, c in enumerate(counts) if c)
+    [('AT', 3), ('CG', 1), ('GA', 1), ('TC', 2)]
+    """
+    counts = array('L', [0]) * 4**k
+    code = dict(CODE)
+    code.update((c.lower(), i) for c, i in CODE.items())
+    shift = 2 * (k - 1)
+    x, valid = 0, 0
+    for chunk in stream:
+        for c in chunk:
+            i = code.get(c)
+            if i is None:
+                if c not in '\r\n':
+                    valid = 0
+                continue
+            x = (x >> 2) | (i << shift)
+            valid += 1
+            if valid >= k:
+                counts[x] += 1
+    return counts
+
+
+#------------------------------------------------------------------------------
+# Benchmark
+#------------------------------------------------------------------------------
+
+import sys
 import timeit
-#print timeit.Timer("ATCG.gen(6)", "import ATCG").timeit(10)
-#print timeit.Timer("ATCG.gen0(6)", "import ATCG").timeit(10)
+
+from peak_rss import peak_growth, isolated
+
+
+GENERATORS = ['gen0', 'gen0_1', 'gen0_2', 'gen1', 'gen1_1', 'gen1_2', 'gen2',
+              'iter_kmers', 'iter_packed']
+
+
+def consume(name, n):
+    """Generate all k-mers of n bases with a generator and return the number
+    of them; lazy generators are run out.
+
+    Example
+    -------
+    >>> [consume(name, 3) for name in GENERATORS] == [4**3] * len(GENERATORS)
+    True
+    """
+    result = globals()[name](n)
+    if isinstance(result, list):
+        return len(result)
+    if name == 'iter_packed':
+        return sum(len(a) for a in result)
+    return sum(1 for x in result)
+
+
+def measure(args):
+    """Return (sec per k-mer, bytes per k-mer) of a generator on n bases.
+
+    The time is the best of 3 runs of enough loops to take 4**8 k-mers; the
+    memory is the growth of the peak RSS over the first run, so this should
+    run in a fresh process.
+    """
+    name, n = args
+    N = 4**n
+    count, mem = peak_growth(consume, name, n)
+    number = max(1, 4**8 / N)
+    timer = timeit.Timer(lambda: consume(name, n))
+    sec = min(timer.repeat(3, number)) / number
+    mem = None if mem is None else float(mem) / N
+    return sec / N, mem
+
+
+def benchmark(names=GENERATORS, ns=range(1, 13)):
+    """Measure generators on every n in a fresh process and return records
+    of (n, name, sec per k-mer, bytes per k-mer).
+    """
+    records = []
+    for n in ns:
+        for name in names:
+            sec, mem = isolated(measure, (name, n))
+            records.append((n, name, sec, mem))
+    return records
+
+
+def print_benchmark(names=GENERATORS, ns=range(1, 13)):
+    """Print the time and memory per k-mer of generators, and mark the
+    fastest one for every n with '*'.
+    """
+    print '%2s %-12s %14s %14s' % ('n', 'generator', 'ns/k-mer', 'bytes/k-mer')
+    for n in ns:
+        records = benchmark(names, [n])
+        fastest = min(records, key=lambda r: r[2])
+        for r in records:
+            n, name, sec, mem = r
+            mem = '-' if mem is None else '%.1f' % mem
+            mark = '*' if r is fastest else ''
+            print '%2u %-12s %14.1f %14s %s' % (n, name, sec*1e9, mem, mark)
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    import doctest
+    failures, tests = doctest.testmod()
+    if failures == 0:
+        print_benchmark(ns=range(1, int((sys.argv[1:] or [12])[0]) + 1))
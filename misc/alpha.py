@@ -5,48 +5,349 @@ The alpha band means the 'A' band of 'RGBA' of pixels
 """
 __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
 __date__ = "2009/02/03~2009/02/13"
-__version__ = "1.5"
+__version__ = "1.8"
 
 import sys
 import os
+import re
 import glob
+import json
 import getopt
+import hashlib
+import binascii
+import multiprocessing
 
 from PIL import Image
 
 
-def convert(infile, format):
+def hex_lines(data):
+    """Return the hex text of bytes, one byte per line.
+
+    The whole text is built with bulk slice assignments instead of one
+    formatting per byte.
+
+    Example
+    -------
+    >>> hex_lines('\\x00\\x7f\\xff')
+    '00\\n7F\\nFF\\n'
+    """
+    hex_ = binascii.hexlify(data).upper()
+    out = bytearray(3 * len(data))
+    out[0::3] = hex_[0::2]
+    out[1::3] = hex_[1::2]
+    out[2::3] = '\n' * len(data)
+    return str(out)
+
+
+# alpha -> its 4-bit value (rounded) in the high nibble
+_TO_A4 = ''.join(chr(min((v + 8) >> 4, 15) << 4) for v in range(256))
+# alpha -> '1' (opaque) or '0' (transparent) with the threshold of 128
+_TO_A1 = ''.join('1' if v >= 128 else '0' for v in range(256))
+
+
+def pack_a4(data):
+    """Return 4-bit alpha bytes packed 2 pixels per byte, the 1st pixel in
+    the high nibble.
+
+    Example
+    -------
+    >>> binascii.hexlify(pack_a4('\\x00\\xff\\x80\\x10\\x07'))
+    '0f8100'
+    """
+    hex_ = binascii.hexlify(data.translate(_TO_A4))[0::2]
+    if len(hex_) % 2:
+        hex_ += '0'
+    return binascii.unhexlify(hex_)
+
+
+def pack_a1(data):
+    """Return 1-bit alpha bytes packed 8 pixels per byte, the 1st pixel in
+    the MSB.
+
+    Example
+    -------
+    >>> binascii.hexlify(pack_a1('\\xff\\x00\\xff\\xff\\x00\\x00\\x00\\x80\\xff'))
+    'b180'
+    """
+    if not data:
+        return ''
+    bits = data.translate(_TO_A1)
+    bits += '0' * (-len(bits) % 8)
+    return binascii.unhexlify('%0*x' % (len(bits) / 4, int(bits, 2)))
+
+
+def encode_rle(data):
+    """Return run-length encoded bytes as (count, value) pairs, count 1-255.
+
+    Masks that are mostly opaque (or transparent) have few long runs.
+
+    Example
+    -------
+    >>> binascii.hexlify(encode_rle('\\xff' * 300 + '\\x00\\x00'))
+    'ffff2dff0200'
+    """
+    out = []
+    for m in re.finditer(r'(.)\1*', data, re.DOTALL):
+        v, n = m.group(1), m.end() - m.start()
+        while n:
+            k = min(n, 255)
+            out.append(chr(k) + v)
+            n -= k
+    return ''.join(out)
+
+
+def c_array(name, data, comments=(), per_line=16):
+    """Return the C source of a byte array.
+
+    Example
+    -------
+    >>> print c_array('a', '\\x00\\xff\\x80', ['3 bytes'])
+    // 3 bytes
+    const unsigned char a[3] = {
+        0x00, 0xFF, 0x80,
+    };
+    <BLANKLINE>
+    """
+    lines = ['// %s' % c for c in comments]
+    lines += ['const unsigned char %s[%u] = {' % (name, len(data))]
+    for i in xrange(0, len(data), per_line):
+        lines += ['    ' + ' '.join('0x%02X,' % ord(b)
+                                    for b in data[i:i+per_line])]
+    lines += ['};', '']
+    return '\n'.join(lines)
+
+
+# output format -> (file extension, encoder)
+ALPHA_FORMATS = {
+    'hex': ('hex', hex_lines),
+    'bin': ('bin', str),
+    'a4': ('a4', pack_a4),
+    'a1': ('a1', pack_a1),
+    'rle': ('rle', encode_rle),
+}
+
+
+def convert(infile, format, alpha='hex', c=False, crop=False):
     """Split a PNG file into RGB part and alpha part.
 
+    The outputs are saved beside the input file.
+
     arguments:
     infile -- the input file name of the PNG image
     format -- the output file format of the RGB part
+    alpha -- the output format of the alpha part; see ALPHA_FORMATS
+    c -- emit the alpha part as a C array (raw bytes for the hex format)
+    crop -- crop both parts to the bounding box of non-transparent pixels;
+            the box is saved to a .alpha.box file as "left top right bottom"
+            and the image size in the next line
+
+    Return the list of output files. A fully transparent image cropped has
+    an empty alpha part, the box (0, 0, 0, 0) and no RGB part.
+
+    Example
+    -------
+    >>> import shutil, tempfile
+    >>> d = tempfile.mkdtemp()
+    >>> Image.new('RGBA', (4, 3)).save(os.path.join(d, 'empty.png'))
+    >>> outputs = convert(os.path.join(d, 'empty.png'), 'bmp', crop=True)
+    >>> [os.path.basename(f) for f in outputs]
+    ['empty.alpha.box', 'empty.alpha.hex']
+    >>> [open(f, 'rb').read() for f in outputs]
+    ['0 0 0 0\\n4 3\\n', '']
+    >>> shutil.rmtree(d)
     """
-    base = os.path.basename(infile)
-    main, ext = os.path.splitext(base)
+    main, ext = os.path.splitext(infile)
+    outputs = []
 
     im = Image.open(infile)
-    alpha = im.split()[3].getdata()
-    hex_ = "".join(("%02X\n" % v for v in alpha))
-    file(main+'.alpha.hex', 'wb').write(hex_)
+    if im.mode != 'RGBA':
+        im = im.convert('RGBA')
+    bands = im.split()      # decodes the image once for all bands
+    if crop:
+        box = bands[3].getbbox()
+        if box is None:     # fully transparent; nothing to crop
+            box = (0, 0, 0, 0)
+            bands = None
+        else:
+            bands = [b.crop(box) for b in bands]
+        file(main+'.alpha.box', 'wb').write('%u %u %u %u\n%u %u\n'
+                                           % (box + im.size))
+        outputs.append(main+'.alpha.box')
+
+    data = bands[3].tobytes() if bands else ''
+    if c:
+        if alpha == 'hex':
+            alpha = 'bin'
+        ext, encode = ALPHA_FORMATS[alpha]
+        name = re.sub(r'\W', '_', os.path.basename(main)) + '_alpha'
+        w, h = bands[3].size if bands else (0, 0)
+        text = c_array(name, encode(data),
+                       ['%s: %ux%u alpha (%s)' % (infile, w, h, alpha)])
+        outputs.append('%s.alpha.%s.c' % (main, ext))
+        file(outputs[-1], 'wb').write(text)
+    else:
+        ext, encode = ALPHA_FORMATS[alpha]
+        outputs.append('%s.alpha.%s' % (main, ext))
+        file(outputs[-1], 'wb').write(encode(data))
 
     #im.save(main + '.jpg')  # progressive==progression (True==False==None bug??)
-    im.convert('RGB').save(".".join([main, format]))
+    if bands:
+        outputs.append(".".join([main, format]))
+        Image.merge('RGB', bands[:3]).save(outputs[-1])
+    return outputs
+
+
+def _convert_task(args):
+    """Convert a file; return (the file, its outputs, its stamp), the stamp
+    of the incremental mode only.
+    """
+    incremental, args = args[0], args[1:]
+    stamp = file_stamp(args[0], digest=True) if incremental else None
+    return args[0], convert(*args), stamp
+
+#------------------------------------------------------------------------------
+# Incremental rebuild
+#------------------------------------------------------------------------------
+# A manifest (a JSON file) records the conversion options, and the mtime, the
+# size, the SHA-1 and the outputs of every converted file. A file is up to
+# date if its outputs exist and either its mtime and size, or else its SHA-1,
+# are the same as recorded.
+
+MANIFEST = 'alpha.manifest'
+
+
+def file_digest(path):
+    """Return the SHA-1 hex digest of a file."""
+    h = hashlib.sha1()
+    f = open(path, 'rb')
+    for block in iter(lambda: f.read(1 << 16), ''):
+        h.update(block)
+    f.close()
+    return h.hexdigest()
+
+
+def file_stamp(path, digest=False):
+    """Return the record {mtime, size[, sha1]} of a file."""
+    st = os.stat(path)
+    stamp = {'mtime': st.st_mtime, 'size': st.st_size}
+    if digest:
+        stamp['sha1'] = file_digest(path)
+    return stamp
+
+
+def load_manifest(path):
+    """Return the manifest {'options': ..., 'files': {...}} in a file."""
+    if not os.path.exists(path):
+        return {'options': None, 'files': {}}
+    return json.load(open(path, 'rb'))
+
+
+def save_manifest(path, manifest):
+    f = open(path, 'wb')
+    json.dump(manifest, f, indent=1, sort_keys=True)
+    f.close()
+
+
+def is_up_to_date(infile, record):
+    """Decide whether the outputs of a file in the manifest are up to date.
+
+    The record of a file touched but not changed is updated.
+    """
+    if not record or not all(os.path.exists(f) for f in record['outputs']):
+        return False
+    stamp = file_stamp(infile)
+    if (stamp['mtime'], stamp['size']) == (record['mtime'], record['size']):
+        return True
+    if stamp['size'] != record['size'] or \
+       file_digest(infile) != record['sha1']:
+        return False
+    record.update(stamp)
+    return True
+
+
+def find_png_files(dirs, recursive=False):
+    """Return the .png files in directories, or in their trees if recursive."""
+    files = []
+    for d in dirs:
+        if not recursive:
+            files += glob.glob(os.path.join(d, '*.png'))
+            continue
+        for root, subdirs, names in os.walk(d):
+            subdirs.sort()
+            files += [os.path.join(root, n) for n in sorted(names)
+                      if n.lower().endswith('.png')]
+    return [os.path.normpath(f) for f in files]
+
+
+def convert_all(files, format, jobs=1, alpha='hex', c=False, crop=False,
+                manifest=None):
+    """Convert PNG files by jobs processes and print each processed file.
+
+    If a manifest file is given, only files changed since the last run are
+    converted; it is saved even if a conversion fails, so the converted files
+    are not redone. See convert for the other arguments.
+    """
+    options = [format, alpha, c, crop]
+    if manifest:
+        records = load_manifest(manifest)
+        if records['options'] != options:
+            records = {'options': options, 'files': {}}
+        old = records['files']
+        records['files'] = dict((f, old[f]) for f in files if f in old)
+        files = [f for f in files
+                 if not is_up_to_date(f, records['files'].get(f))]
+        print '%u file(s) to process' % len(files)
+
+    tasks = [(bool(manifest), f, format, alpha, c, crop) for f in files]
+    pool = None
+    try:
+        if jobs > 1:
+            pool = multiprocessing.Pool(jobs)
+            results = pool.imap_unordered(_convert_task, tasks)
+        else:
+            results = (_convert_task(t) for t in tasks)
+        for infile, outputs, stamp in results:
+            print 'Processed', infile
+            if manifest:
+                stamp['outputs'] = outputs
+                records['files'][infile] = stamp
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if manifest:
+            save_manifest(manifest, records)
 
 #------------------------------------------------------------------------------
 
 def usage():
     print """\
-Usage: alpha [option]
+Usage: alpha [option] [DIR...]
 
 Option:
     -fEXT, --format=EXT assign RGB output format, e.g. JPG, BMP (the default).
+    -aFMT, --alpha=FMT  assign alpha output format:
+                          hex - a hex text line per pixel (the default);
+                          bin - raw 8-bit bytes;
+                          a4  - 4-bit alpha, 2 pixels per byte;
+                          a1  - 1-bit alpha, 8 pixels per byte;
+                          rle - (count, value) byte pairs of runs.
+    -c, --c-array       emit the alpha part as a C array.
+    --crop              crop to the bounding box of non-transparent pixels,
+                        and save the box to a .alpha.box file.
+    -jN, --jobs=N       process files with N processes (1 is the default).
+    -r, --recursive     process .png files in directory trees.
+    -i, --incremental   process only files changed since the last run, as
+                        recorded in the manifest file (%s).
+    --manifest=FILE     assign the manifest file of the incremental mode
+                        (implies -i).
     -h, --help          show this help message and exit.
     -v, --version       show version info. and exit.
 
 Purpose:
-    Read all RGBA .png files in current directory and split into Alpha part
-    and RGB part."""
+    Read all RGBA .png files in directories (the current directory by
+    default) and split into Alpha part and RGB part beside each file.""" % (
+        MANIFEST)
 
 
 def main(args=None):
@@ -55,21 +356,40 @@ def main(args=None):
     else:
         args = args.split()
     try:
-        opts, args = getopt.getopt(args, "hf:v",
-                                   ["help", "format=", "version"])
+        opts, args = getopt.getopt(args, "hf:a:cj:riv",
+                                   ["help", "format=", "alpha=", "c-array",
+                                    "crop", "jobs=", "recursive",
+                                    "incremental", "manifest=", "version"])
     except getopt.GetoptError, err:
         print str(err)
         usage()
         return 2
 
-    if args != []:
-        usage()
-        return 0
-
     format = 'bmp'
+    jobs = 1
+    recursive = False
+    options = {}
     for o, a in opts:
         if o in ("-f", "--format"):
             format = a
+        elif o in ("-a", "--alpha"):
+            if a.lower() not in ALPHA_FORMATS:
+                print "unknown alpha format", a
+                usage()
+                return 2
+            options['alpha'] = a.lower()
+        elif o in ("-c", "--c-array"):
+            options['c'] = True
+        elif o == "--crop":
+            options['crop'] = True
+        elif o in ("-j", "--jobs"):
+            jobs = int(a)
+        elif o in ("-r", "--recursive"):
+            recursive = True
+        elif o in ("-i", "--incremental"):
+            options.setdefault('manifest', MANIFEST)
+        elif o == "--manifest":
+            options['manifest'] = a
         elif o in ("-h", "--help"):
             usage()
             return 0
@@ -81,9 +401,8 @@ def main(args=None):
         else:
             assert False, "unhandled option"
 
-    for infile in glob.glob('*.png'):
-        print 'Processing', infile
-        convert(infile, format.lower())
+    files = find_png_files(args or ['.'], recursive)
+    convert_all(files, format.lower(), jobs, **options)
 
 
 if __name__ == '__main__':
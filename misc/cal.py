@@ -8,6 +8,11 @@ __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
 __date__ = "2008/08/23 (initial version)"
 __version__ = "1.5"
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def weekHeader():
     return "Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"
@@ -36,10 +41,28 @@ def daysOfMonth(year, month):
     >>> daysOfMonth(2008, 3)
     31
     """
-    d = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-    if isLeap(year):
-        d[1] += 1
-    return d[month-1]
+    return _DAYS[isLeap(year)][month-1]
+
+
+_DAYS = (
+    (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+
+# days before each month; the 13th is the days of the year
+_CUMDAYS = tuple(tuple(sum(d[:m]) for m in range(13)) for d in _DAYS)
+
+
+def dayOfYear(year, month, day):
+    """Return the day (1-366) of the year for year (1584-...), month (1-12),
+    day (1-31).
+
+    Example
+    -------
+    >>> dayOfYear(2009, 3, 7), dayOfYear(2008, 3, 7), dayOfYear(2008, 12, 31)
+    (66, 67, 366)
+    """
+    return _CUMDAYS[isLeap(year)][month-1] + day
 
 
 def Zeller(year, month, day):
@@ -138,6 +161,213 @@ def military_from_AMPM(h, ampm):
         h = 0
     return h + ampm*12
 
+#------------------------------------------------------------------------------
+# Serial day numbers
+#------------------------------------------------------------------------------
+# A serial day number counts days from 0001/01/01 (day 1) of the proleptic
+# Gregorian calendar, the same as datetime.date.toordinal(). As Zeller_m, it
+# counts in years starting with March, so that leap days are at year ends;
+# day 1 is a Monday, thus the weekday of a day number is simply n % 7.
+
+def dayNumber(year, month, day):
+    """Return the serial day number of a date.
+
+    Example
+    -------
+    >>> dayNumber(1, 1, 1), dayNumber(2009, 3, 7)
+    (1, 733473)
+    >>> dayNumber(2009, 3, 7) % 7 == weekday(2009, 3, 7)
+    True
+    """
+    a = (14-month)/12
+    Y = year - a
+    M = month + 12*a - 3    # 0 is March
+    return 365*Y + Y/4 - Y/100 + Y/400 + (153*M + 2)/5 + day - 306
+
+
+def dateFromDayNumber(n):
+    """Return the date (year, month, day) of a serial day number.
+
+    Example
+    -------
+    >>> dateFromDayNumber(733473)
+    (2009, 3, 7)
+    >>> all(dateFromDayNumber(dayNumber(y, m, d)) == (y, m, d)
+    ...     for y in (1600, 1900, 2000, 2009) for m in range(1, 13)
+    ...     for d in range(1, daysOfMonth(y, m) + 1))
+    True
+    """
+    n += 305                # days from 0000/03/01
+    era = n / 146097
+    doe = n - era*146097    # day of the 400-year era
+    yoe = (doe - doe/1460 + doe/36524 - doe/146096) / 365
+    doy = doe - (365*yoe + yoe/4 - yoe/100)
+    M = (5*doy + 2) / 153   # 0 is March
+    day = doy - (153*M + 2)/5 + 1
+    month = M + 3 if M < 10 else M - 9
+    year = era*400 + yoe + (month <= 2)
+    return year, month, day
+
+
+def dateRange(start, stop, step=1):
+    """Lazily yield the dates (year, month, day) from the start date to the
+    stop date (exclusive) by step days.
+
+    Example
+    -------
+    >>> list(dateRange((2008, 2, 27), (2008, 3, 2)))
+    [(2008, 2, 27), (2008, 2, 28), (2008, 2, 29), (2008, 3, 1)]
+    >>> list(dateRange((2009, 3, 7), (2009, 2, 20), -7))
+    [(2009, 3, 7), (2009, 2, 28), (2009, 2, 21)]
+    """
+    for n in xrange(dayNumber(*start), dayNumber(*stop), step):
+        yield dateFromDayNumber(n)
+
+
+def monthGrid(year, month):
+    """Return the weeks (Sunday first) of a month; days out of the month are
+    0.
+
+    Example
+    -------
+    >>> for week in monthGrid(2009, 2): print week
+    [1, 2, 3, 4, 5, 6, 7]
+    [8, 9, 10, 11, 12, 13, 14]
+    [15, 16, 17, 18, 19, 20, 21]
+    [22, 23, 24, 25, 26, 27, 28]
+    """
+    return _grid(dayNumber(year, month, 1) % 7, daysOfMonth(year, month))
+
+
+def _grid(first, days):
+    """Return the weeks of a month starting on weekday first with days."""
+    cells = [0]*first + range(1, days + 1)
+    cells += [0] * (-len(cells) % 7)
+    return [cells[i:i+7] for i in xrange(0, len(cells), 7)]
+
+
+def monthGrids(year, month, count):
+    """Lazily yield (year, month, weeks) of count months from a month; see
+    monthGrid.
+
+    Only the first month needs a day number; the weekdays of the following
+    months are carried with the days of months.
+
+    Example
+    -------
+    >>> [(y, m, len(g)) for y, m, g in monthGrids(2008, 11, 4)]
+    [(2008, 11, 6), (2008, 12, 5), (2009, 1, 5), (2009, 2, 4)]
+    >>> all(g == monthGrid(y, m) for y, m, g in monthGrids(1999, 1, 120))
+    True
+    """
+    first = dayNumber(year, month, 1) % 7
+    for i in xrange(count):
+        days = daysOfMonth(year, month)
+        yield year, month, _grid(first, days)
+        first = (first + days) % 7
+        year, month = year + month/12, month % 12 + 1
+
+#------------------------------------------------------------------------------
+# Vectorized versions for arrays of dates
+#------------------------------------------------------------------------------
+# The Gregorian calendar repeats every 400 years (146097 days, i.e., 20871
+# weeks), so the leap flags and the weekdays of Jan 1 of a 400-year cycle are
+# tabulated once, and the rest is table lookups indexed by year % 400.
+
+CYCLE = 400
+
+_LEAP_CYCLE = tuple(isLeap(y) for y in range(2000, 2000 + CYCLE))
+_JAN1_CYCLE = tuple(Zeller_m(y, 1, 1) for y in range(2000, 2000 + CYCLE))
+
+
+def weekday_cycle(year, month, day):
+    """Return the day (0-6; 0 is Sunday) of the week with the 400-year cycle
+    tables.
+
+    Example
+    -------
+    >>> weekday_cycle(2009, 3, 7)
+    6
+    >>> all(weekday_cycle(y, m, 1) == weekday(y, m, 1)
+    ...     for y in range(1600, 2400) for m in range(1, 13))
+    True
+    """
+    r = year % CYCLE
+    return (_JAN1_CYCLE[r] + _CUMDAYS[_LEAP_CYCLE[r]][month-1] + day - 1) % 7
+
+
+if np is not None:
+    _LEAP_CYCLE_A = np.array(_LEAP_CYCLE, np.intp)
+    _JAN1_CYCLE_A = np.array(_JAN1_CYCLE, np.intp)
+    _DAYS_A = np.array(_DAYS, np.intp)
+    _CUMDAYS_A = np.array(_CUMDAYS, np.intp)
+
+
+def isLeap_array(years):
+    """Vectorized isLeap; return an array of leap flags (0 or 1) of years.
+
+    Example
+    -------
+    >>> isLeap_array([1900, 2000, 2004, 2009])
+    array([0, 1, 1, 0])
+    """
+    return _LEAP_CYCLE_A[np.asarray(years) % CYCLE]
+
+
+def daysOfMonth_array(years, months):
+    """Vectorized daysOfMonth.
+
+    Example
+    -------
+    >>> daysOfMonth_array([1995, 2008, 2000], [2, 2, 3])
+    array([28, 29, 31])
+    """
+    leaps = isLeap_array(years)
+    return _DAYS_A[leaps, np.asarray(months) - 1]
+
+
+def dayOfYear_array(years, months, days):
+    """Vectorized dayOfYear.
+
+    Example
+    -------
+    >>> dayOfYear_array([2009, 2008, 2008], [3, 3, 12], [7, 7, 31])
+    array([ 66,  67, 366])
+    """
+    leaps = isLeap_array(years)
+    return _CUMDAYS_A[leaps, np.asarray(months) - 1] + days
+
+
+def weekday_array(years, months, days):
+    """Vectorized weekday.
+
+    Example
+    -------
+    >>> weekday_array([2009, 2009, 2008], [3, 2, 2], [7, 22, 29])
+    array([6, 0, 5])
+    """
+    r = np.asarray(years) % CYCLE
+    doy = _CUMDAYS_A[_LEAP_CYCLE_A[r], np.asarray(months) - 1] + days
+    return (_JAN1_CYCLE_A[r] + doy - 1) % 7
+
+
+def tag_dates(years, months, days):
+    """Return arrays of (weekday, leap flag, days of month, day of year) of
+    columns of dates in one pass; year % 400 and the leap flags are computed
+    only once.
+
+    Example
+    -------
+    >>> w, leap, dim, doy = tag_dates([2009, 2008], [3, 2], [7, 29])
+    >>> w, leap, dim, doy
+    (array([6, 5]), array([0, 1]), array([31, 29]), array([66, 60]))
+    """
+    r = np.asarray(years) % CYCLE
+    m = np.asarray(months) - 1
+    leaps = _LEAP_CYCLE_A[r]
+    doy = _CUMDAYS_A[leaps, m] + days
+    return (_JAN1_CYCLE_A[r] + doy - 1) % 7, leaps, _DAYS_A[leaps, m], doy
+
 
 if __name__ == "__main__":
     import doctest
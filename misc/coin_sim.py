@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo simulator of coin throwing for large N
+
+Unlike the snippets in CoinThrowing.py, throws are drawn in blocks of packed
+random bits (NumPy arrays if NumPy is installed) and summarized per block, so
+memory does not grow with N. The summary of a sequence of throws is made of
+its head count, a histogram of run lengths, and its first and last runs which
+are still open to be joined with neighboring blocks. Summaries of blocks or of
+shards (run by processes with independent random streams) are merged in order
+as if one long sequence was thrown.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import os
+import re
+import sys
+import getopt
+import shutil
+import tempfile
+import random
+import hashlib
+import multiprocessing
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+HEAD, TAIL = 1, 0
+BLOCK = 1 << 20     # throws per block
+
+
+class Summary(object):
+    """The summary of a sequence of throws.
+
+    Attributes
+    ----------
+    throws  the number of throws
+    heads   the number of heads
+    hist    a pair of dictionaries {run length: count} of the closed runs of
+            tails and of heads
+    ends    the first and the last runs as (side, length); only one run if
+            the whole sequence is a run
+
+    Example
+    -------
+    >>> s = Summary.from_runs([HEAD, TAIL, HEAD], [2, 1, 3])
+    >>> s.merge(Summary.from_runs([HEAD, TAIL], [1, 4])).finish()
+    >>> s.throws, s.heads, s.longest(HEAD), s.longest(TAIL)
+    (11, 6, 4, 4)
+    >>> s.hist
+    [{1: 1, 4: 1}, {2: 1, 4: 1}]
+    """
+
+    def __init__(self):
+        self.throws = 0
+        self.heads = 0
+        self.hist = [{}, {}]
+        self.ends = []
+
+    @classmethod
+    def from_runs(cls, sides, lengths):
+        """Return the summary of runs of alternating sides."""
+        s = cls()
+        n = len(lengths)
+        s.throws = int(sum(lengths))
+        s.heads = int(sum(lengths[i] for i in xrange(n) if sides[i] == HEAD))
+        for i in xrange(1, n - 1):
+            h = s.hist[sides[i]]
+            h[lengths[i]] = h.get(lengths[i], 0) + 1
+        if n:
+            s.ends = [(int(sides[0]), int(lengths[0]))]
+        if n > 1:
+            s.ends.append((int(sides[-1]), int(lengths[-1])))
+        return s
+
+    def _count(self, side, length, count=1):
+        h = self.hist[side]
+        h[length] = h.get(length, 0) + count
+
+    def merge(self, other):
+        """Append the throws of another summary to this one."""
+        self.throws += other.throws
+        self.heads += other.heads
+        for side in (TAIL, HEAD):
+            for length, count in other.hist[side].iteritems():
+                self._count(side, length, count)
+
+        runs = self.ends + other.ends
+        if self.ends and other.ends:
+            i = len(self.ends) - 1
+            if runs[i][0] == runs[i+1][0]:
+                runs[i:i+2] = [(runs[i][0], runs[i][1] + runs[i+1][1])]
+        for side, length in runs[1:-1]:
+            self._count(side, length)
+        self.ends = runs[:1] + runs[1:][-1:]
+        return self
+
+    def finish(self):
+        """Close the first and last runs, i.e., no more throws to merge."""
+        for side, length in self.ends:
+            self._count(side, length)
+        self.ends = []
+
+    def longest(self, side):
+        """Return the longest streak of a side."""
+        return max(self.hist[side] or [0])
+
+    def runs(self):
+        """Return the number of closed runs."""
+        return sum(sum(h.itervalues()) for h in self.hist)
+
+#------------------------------------------------------------------------------
+# Throwing blocks
+#------------------------------------------------------------------------------
+
+def _stream(seed, shard):
+    """Return a random stream of a shard, independent of other shards."""
+    digest = hashlib.sha256('%r/%r' % (seed, shard)).digest()
+    if np is not None:
+        return np.random.RandomState(np.frombuffer(digest, np.uint32))
+    return random.Random(int(digest.encode('hex'), 16))
+
+
+def _throw_numpy(rng, n):
+    """Return n throws of 0 (tail) or 1 (head) in a NumPy uint8 array."""
+    bits = np.frombuffer(rng.bytes((n + 7) / 8), np.uint8)
+    return np.unpackbits(bits)[:n]
+
+
+def _summarize_numpy(b):
+    n = len(b)
+    starts = np.concatenate(([0], np.flatnonzero(b[1:] != b[:-1]) + 1))
+    lengths = np.diff(np.append(starts, n))
+    sides = b[starts]
+    s = Summary()
+    s.throws = n
+    s.heads = int(np.count_nonzero(b))
+    for side in (TAIL, HEAD):
+        inner = lengths[1:-1][sides[1:-1] == side]
+        counts = np.bincount(inner) if len(inner) else np.zeros(0, np.int64)
+        for length in np.flatnonzero(counts):
+            s.hist[side][int(length)] = int(counts[length])
+    s.ends = [(int(sides[0]), int(lengths[0]))]
+    if len(lengths) > 1:
+        s.ends.append((int(sides[-1]), int(lengths[-1])))
+    return s
+
+
+def _throw_bits(rng, n):
+    """Return n throws as a string of '0' (tail) and '1' (head)."""
+    return format(rng.getrandbits(n), '0%ub' % n)
+
+
+def _summarize_bits(bits):
+    runs = re.findall('0+|1+', bits)
+    first = int(bits[0])
+    sides = [(first + i) & 1 for i in xrange(len(runs))]
+    return Summary.from_runs(sides, map(len, runs))
+
+
+def throw(n, seed=None, shard=0, block=BLOCK, out=None):
+    """Throw n coins in blocks and return the summary.
+
+    Arguments
+    ---------
+    n       the number of throws
+    seed    the seed for reproducibility; None for a random one
+    shard   the index of an independent random stream of the seed
+    block   the number of throws per block
+    out     a file to write every throw as a line of H or T; None for quiet
+
+    Example
+    -------
+    >>> s = throw(10**5, seed=1, block=1000)
+    >>> s.throws, abs(s.heads - 50000) < 1000
+    (100000, True)
+    >>> s.finish()
+    >>> sum(k*c for h in s.hist for k, c in h.items())
+    100000
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    rng = _stream(seed, shard)
+    if np is not None:
+        draw, summarize, sides = _throw_numpy, _summarize_numpy, '\x00\x01'
+    else:
+        draw, summarize, sides = _throw_bits, _summarize_bits, '01'
+    table = None
+    if out is not None:
+        import string
+        table = string.maketrans(sides, 'TH')
+
+    s = Summary()
+    for a in xrange(0, n, block):
+        b = draw(rng, min(block, n - a))
+        if table:
+            text = b if isinstance(b, str) else b.tostring()
+            out.write('\n'.join(text.translate(table)) + '\n')
+        s.merge(summarize(b))
+    return s
+
+
+def _throw_shard(args):
+    """Throw a shard; its throws are written to a file if a path is given."""
+    n, seed, shard, block, path = args
+    if path is None:
+        return throw(n, seed, shard, block)
+    f = open(path, 'wb')
+    try:
+        return throw(n, seed, shard, block, f)
+    finally:
+        f.close()
+
+
+def simulate(n, seed=None, jobs=1, block=BLOCK, out=None):
+    """Throw n coins by jobs processes, each of an independent random stream,
+    and return the finished summary.
+
+    The result of a seed depends on jobs and block, since shards draw from
+    different streams in blocks, but not on out. If out is a file, every
+    throw is written to it as a line of H or T, in order; shards of processes
+    write to temporary files first.
+
+    Example
+    -------
+    >>> a = simulate(10**5, seed=7, jobs=2, block=1000)
+    >>> b = simulate(10**5, seed=7, jobs=2, block=1000)
+    >>> (a.heads, a.hist) == (b.heads, b.hist)
+    True
+    >>> from StringIO import StringIO
+    >>> out = StringIO()
+    >>> c = simulate(20, seed=5, jobs=2, out=out)
+    >>> d = simulate(20, seed=5, jobs=2)
+    >>> (c.heads, c.hist) == (d.heads, d.hist), out.getvalue().count('H')
+    (True, 12)
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    tmpdir = None
+    paths = [None] * jobs
+    if out is not None and jobs > 1:
+        tmpdir = tempfile.mkdtemp()
+        paths = [os.path.join(tmpdir, '%u' % i) for i in xrange(jobs)]
+    tasks = [(n * i / jobs - n * (i - 1) / jobs, seed, i, block, paths[i-1])
+             for i in xrange(1, jobs + 1)]
+    pool = None
+    try:
+        if jobs > 1:
+            pool = multiprocessing.Pool(jobs)
+            summaries = pool.imap(_throw_shard, tasks)
+        else:
+            summaries = (throw(t[0], seed, t[2], block, out) for t in tasks)
+        s = Summary()
+        for i, t in enumerate(summaries):
+            path = paths[i]
+            if path is not None:
+                f = open(path, 'rb')
+                shutil.copyfileobj(f, out)
+                f.close()
+            s.merge(t)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir)
+    s.finish()
+    return s
+
+#------------------------------------------------------------------------------
+
+def print_summary(s):
+    print 'H:', s.heads
+    print 'T:', s.throws - s.heads
+    print 'Runs:', s.runs()
+    print 'Longest H streak:', s.longest(HEAD)
+    print 'Longest T streak:', s.longest(TAIL)
+    print 'Run length: H runs, T runs'
+    for length in xrange(1, max(s.longest(HEAD), s.longest(TAIL)) + 1):
+        print '%u: %u, %u' % (length, s.hist[HEAD].get(length, 0),
+                              s.hist[TAIL].get(length, 0))
+
+
+def usage():
+    print """\
+Usage: coin_sim [option]
+
+Option:
+    -n N, --throws=N    throw N coins (100 is the default).
+    -s SEED, --seed=SEED
+                        seed the random streams for reproducible results.
+    -j N, --jobs=N      throw with N processes of independent random streams
+                        (1 is the default).
+    -b N, --block=N     draw N throws per block (%u is the default).
+    -q, --quiet         show the summary only; do not print every throw.
+    -h, --help          show this help message and exit.
+    -v, --version       show version info. and exit.""" % BLOCK
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "hn:s:j:b:qv",
+                                   ["help", "throws=", "seed=", "jobs=",
+                                    "block=", "quiet", "version"])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    if args != []:
+        usage()
+        return 0
+
+    n, seed, jobs, block, quiet = 100, None, 1, BLOCK, False
+    for o, a in opts:
+        if o in ("-n", "--throws"):
+            n = int(float(a))
+        elif o in ("-s", "--seed"):
+            seed = int(a)
+        elif o in ("-j", "--jobs"):
+            jobs = int(a)
+        elif o in ("-b", "--block"):
+            block = int(a)
+        elif o in ("-q", "--quiet"):
+            quiet = True
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        elif o in ("-v", "--version"):
+            print "Coin Throwing Simulator version", __version__
+            print "by ", __author__
+            print __date__
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    s = simulate(n, seed, jobs, block, None if quiet else sys.stdout)
+    print_summary(s)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
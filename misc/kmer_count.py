@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming k-mer counter of FASTA or plain nucleotide files
+
+k-mers are packed with 2 bits per base in the order of ATCG.decode, and are
+counted with a rolling code, so any file size is processed in constant memory
+except the counter itself. The counter is a dense array of 4**k items for small
+k, or a hash (dictionary) for large k. Files are read by blocks and divided into
+byte ranges, even within a one-line raw sequence, which are counted by a
+process pool and merged.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import os
+import sys
+import time
+import getopt
+import multiprocessing
+from array import array
+
+from ATCG import CODE, unrank
+
+
+DENSE_MAX_K = 10    # the max. k to count with a dense array by default
+BLOCK = 1 << 20     # the bytes to read at a time
+
+_CODE = dict(CODE)
+_CODE.update((c.lower(), i) for c, i in CODE.items())
+
+
+def new_counter(k, dense=None):
+    """Return an empty counter of k-mers: a dense array of 4**k items or a
+    dictionary.
+    """
+    if dense is None:
+        dense = k <= DENSE_MAX_K
+    if dense:
+        return array('L', [0]) * 4**k
+    return {}
+
+
+def merge_counters(a, b):
+    """Add the counts of counter b into counter a, and return a."""
+    if isinstance(a, dict):
+        for x, c in b.iteritems():
+            a[x] = a.get(x, 0) + c
+    else:
+        for x, c in enumerate(b):
+            if c:
+                a[x] += c
+    return a
+
+
+def iter_counts(counts):
+    """Yield (index, count) of nonzero counts of a counter."""
+    if isinstance(counts, dict):
+        return counts.iteritems()
+    return ((x, c) for x, c in enumerate(counts) if c)
+
+#------------------------------------------------------------------------------
+
+def split_file(path, jobs, block=BLOCK):
+    """Return the (start, end) byte ranges that divide a file into at most
+    jobs parts.
+
+    A range may start within a sequence line, so that a one-line raw
+    sequence is divided too; a point in a header or comment line moves to
+    the end of the line. The start of the line of a point is looked for in
+    the block before it; a longer line is taken for a sequence.
+    """
+    size = os.path.getsize(path)
+    points = [0]
+    f = open(path, 'rb')
+    for i in xrange(1, jobs):
+        p = size * i / jobs
+        a = max(p - block, 0)
+        f.seek(a)
+        before = f.read(p - a)
+        j = before.rfind('\n')
+        if (j >= 0 or a == 0) and before[j+1:j+2] in ('>', ';'):
+            f.seek(p)
+            f.readline()
+            p = f.tell()
+        points.append(p)
+    f.close()
+    points = sorted(set(p for p in points if p < size)) + [size]
+    return zip(points[:-1], points[1:])
+
+
+def count_range(task, block=BLOCK):
+    """Count the k-mers which start in a byte range of a file.
+
+    The range starts at a line start or within a sequence line (see
+    split_file), and is read by blocks; the rolling code and the state of
+    the line are carried from block to block. The k-1 bases following the
+    range are read as far as needed to complete the k-mers started in it.
+    Lines starting with '>' or ';' (FASTA headers and comments) break
+    k-mers.
+
+    Arguments
+    ---------
+    task
+        a tuple of (path, start, end, k, dense)
+    block
+        the bytes to read at a time
+
+    Return
+    ------
+    a tuple of (counter, number of bases in the range)
+
+    Example
+    -------
+    >>> import tempfile
+    >>> fd, path = tempfile.mkstemp()
+    >>> data = ('>s1 TTT\\nACGTTGCA\\nAC\\n;x GGG\\nGGGACGTAC\\r\\n>s2\\n' +
+    ...         'ACGTNGTTCA' * 5)
+    >>> _ = os.write(fd, data); os.close(fd)
+    >>> whole, n = count_range((path, 0, os.path.getsize(path), 3, False))
+    >>> n, sorted(whole.values()).count(1), whole[CODE['G'] * 21]
+    (69, 8, 1)
+    >>> for jobs in (2, 7, 30):
+    ...     counts, m = new_counter(3, False), 0
+    ...     for a, b in split_file(path, jobs, 8):
+    ...         c, nb = count_range((path, a, b, 3, False), 5)
+    ...         counts, m = merge_counters(counts, c), m + nb
+    ...     print counts == whole, m == n
+    True True
+    True True
+    True True
+    >>> os.remove(path)
+    """
+    path, start, end, k, dense = task
+    counts = new_counter(k, dense)
+    is_dict = isinstance(counts, dict)
+    code = _CODE
+    shift = 2 * (k - 1)
+    x, valid, bases = 0, 0, 0
+
+    f = open(path, 'rb')
+    head = True     # at a line start
+    if start:
+        f.seek(start - 1)
+        head = f.read(1) == '\n'
+    skip = False    # in a header or comment line
+    pos = start
+    tail = k - 1    # bases to read after the range
+    while True:
+        past = pos >= end
+        if past and tail <= 0:
+            break
+        data = f.read(block if past else min(block, end - pos))
+        if not data:
+            break
+        pos += len(data)
+        for j, line in enumerate(data.split('\n')):
+            if j:
+                head, skip = True, False
+            if not line:
+                continue
+            if head:
+                head = False
+                if line[0] in ('>', ';'):
+                    skip, valid = True, 0
+            if skip:
+                if past:
+                    tail = 0
+                    break
+                continue
+            if past:
+                if valid == 0:
+                    tail = 0
+                    break
+                # fewer than k bases: none after a break completes a k-mer
+                line = line.replace('\r', '')[:tail]
+                tail -= len(line)
+            else:
+                bases += len(line) - line.count('\r')
+            for c in line:
+                i = code.get(c)
+                if i is None:
+                    if c != '\r':
+                        valid = 0
+                    continue
+                x = (x >> 2) | (i << shift)
+                valid += 1
+                if valid >= k:
+                    if is_dict:
+                        counts[x] = counts.get(x, 0) + 1
+                    else:
+                        counts[x] += 1
+            if past and tail <= 0:
+                break
+    f.close()
+    return counts, bases
+
+
+def count_files(paths, k, jobs=1, dense=None):
+    """Count the k-mers of files.
+
+    Return
+    ------
+    a tuple of (counter, number of bases, elapsed seconds)
+    """
+    t0 = time.time()
+    tasks = [(p, a, b, k, dense)
+             for p in paths for a, b in split_file(p, jobs)]
+    if jobs > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(jobs)
+        results = pool.imap_unordered(count_range, tasks)
+    else:
+        pool = None
+        results = (count_range(t) for t in tasks)
+
+    counts, bases = new_counter(k, dense), 0
+    for c, n in results:
+        merge_counters(counts, c)
+        bases += n
+    if pool:
+        pool.close()
+        pool.join()
+    return counts, bases, time.time() - t0
+
+#------------------------------------------------------------------------------
+
+def usage():
+    print """\
+Usage: kmer_count [option] FILE...
+
+Option:
+    -k K, --k=K         count K-mers (6 is the default).
+    -j N, --jobs=N      count with N processes (1 is the default).
+    -t N, --top=N       list the N most frequent k-mers (10 is the default).
+    --dense             count with a dense array of 4**K items (the default
+                        for K <= %u).
+    --hash              count with a hash table (the default for larger K).
+    -h, --help          show this help message and exit.
+    -v, --version       show version info. and exit.
+
+Purpose:
+    Count k-mers of FASTA or plain nucleotide files, and report the
+    throughput in bases/sec.""" % DENSE_MAX_K
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "hk:j:t:v",
+                                   ["help", "k=", "jobs=", "top=", "dense",
+                                    "hash", "version"])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    if args == []:
+        usage()
+        return 0
+
+    k, jobs, top, dense = 6, 1, 10, None
+    for o, a in opts:
+        if o in ("-k", "--k"):
+            k = int(a)
+        elif o in ("-j", "--jobs"):
+            jobs = int(a)
+        elif o in ("-t", "--top"):
+            top = int(a)
+        elif o == "--dense":
+            dense = True
+        elif o == "--hash":
+            dense = False
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        elif o in ("-v", "--version"):
+            print "k-mer Counter version", __version__
+            print "by ", __author__
+            print __date__
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    counts, bases, sec = count_files(args, k, jobs, dense)
+    for x, c in sorted(iter_counts(counts), key=lambda e: -e[1])[:top]:
+        print unrank(x, k), c
+    print >> sys.stderr, '%u bases in %.3f sec (%.0f bases/sec)' % (
+        bases, sec, bases / max(sec, 1e-9))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,216 @@
+"""
+Page imposition for booklet (saddle-stitch) printing.
+
+The sheet, side and slot of every page are computed directly by arithmetic,
+so impositions of any number of pages are yielded lazily or computed as
+NumPy arrays without building lists.
+
+Terms
+-----
+signature   a stack of sheets folded together; signature pages are a
+            multiple of 4, and a saddle-stitched booklet is one signature
+sheet       a press sheet; each has a front side (0) and a back side (1)
+slot        the position of a page on a side, from left to right; a sheet
+            holds nup/2 folded booklet sheets side by side (n-up), in
+            reverse order on the back, so that it backs the front when the
+            sheet is turned over left to right
+creep       the shift of the pages of a folded sheet toward the spine, per
+            sheet from the outermost one of its signature
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (imposition engine)"
+
+
 def num_pages(n):
     """Return two array of page number for a booklet printing
     Inputs:
         n - total pages
 
     Example:
-    >>> numPages(11)
+    >>> num_pages(11)
     (array([12,  1, 10,  3,  8,  5]), array([ 2, 11,  4,  9,  6,  7]))
     """
+    import numpy as np
     N = (n+(4-1))/4*4
-    h = range(1, N/2+1, 1) # head
-    t = range(N, N/2, -1)  # tail
+    s = np.arange(N/4) * 2
+    odd = np.column_stack((N - s, s + 1)).ravel()
+    even = np.column_stack((s + 2, N - 1 - s)).ravel()
+    return odd, even
+
+
+def _signature_size(N, signature=None):
+    """Return the pages of a full signature of N pages (a multiple of 4)."""
+    if signature is None or signature >= N:
+        return N
+    assert signature % 4 == 0, "signature pages must be a multiple of 4"
+    return signature
+
+
+def _signatures(n, signature=None):
+    """Return the page counts of the signatures of n pages; the last one is
+    rounded up to a multiple of 4.
 
+    Example
+    -------
+    >>> _signatures(11), _signatures(40, 16), _signatures(0)
+    ([12], [16, 16, 8], [])
+    """
+    N = (n+(4-1))/4*4
+    if N == 0:
+        return []
+    size = _signature_size(N, signature)
+    full, rest = divmod(N, size)
+    return [size] * full + ([rest] if rest else [])
+
+
+def sheet_count(n, signature=None, nup=2):
+    """Return the number of press sheets of n pages.
+
+    Example
+    -------
+    >>> sheet_count(11), sheet_count(40, 16, nup=4)
+    (3, 5)
+    """
+    folded = sum(_signatures(n, signature)) / 4   # folded booklet sheets
+    k = nup / 2
+    return (folded + k - 1) / k
+
+
+def _folded(n, signature=None):
+    """Yield (first page - 1, pages, index) of the signature of every folded
+    booklet sheet.
+    """
+    base = 0
+    for S in _signatures(n, signature):
+        for i in xrange(S / 4):
+            yield base, S, i
+        base += S
+
+
+def page_slot(p, n, signature=None, nup=2):
+    """Return (sheet, side, slot) of page p (1-based) of n pages.
+
+    Example
+    -------
+    >>> [page_slot(p, 11) for p in (1, 2, 11, 12)]
+    [(0, 0, 1), (0, 1, 0), (0, 1, 1), (0, 0, 0)]
+    >>> [page_slot(p, 8, nup=4) for p in (1, 2, 3, 4)]
+    [(0, 0, 1), (0, 1, 2), (0, 0, 3), (0, 1, 0)]
+    >>> page_slot(1, 11, 6)
+    Traceback (most recent call last):
+    ...
+    AssertionError: signature pages must be a multiple of 4
+    """
+    assert nup % 2 == 0
+    N = (n+(4-1))/4*4
+    size = _signature_size(N, signature)
+    base = (p - 1) / size * size        # the first page of the signature - 1
+    S = min(size, N - base)             # the pages of the signature
+    q = p - base
+    right = q > S / 2                   # the right half of a signature
+    if right:
+        q = S + 1 - q
+    side = (q - 1) % 2
+    pos = side if right else side ^ 1
+    folded = base / 4 + (q - 1) / 2
+    k = nup / 2
+    j = folded % k                      # the folded sheet on the side
+    if side:
+        j = k - 1 - j
+    return folded / k, side, j * 2 + pos
+
+
+def iter_imposition(n, signature=None, nup=2, creep=0.):
+    """Yield (sheet, side, slot, page, shift) of every slot of every side of
+    every sheet in print order; the page of a blank slot is 0.
+
+    Arguments
+    ---------
+    n           the total pages
+    signature   the pages per signature, a multiple of 4; all pages by
+                default (saddle stitch)
+    nup         the pages per side of a sheet, an even number
+    creep       the shift per sheet toward the spine; the shift of a page is
+                creep times the index of its folded sheet in its signature
+
+    Example
+    -------
+    >>> [p for s, d, i, p, c in iter_imposition(11)]
+    [0, 1, 2, 11, 10, 3, 4, 9, 8, 5, 6, 7]
+    >>> list(iter_imposition(4, nup=4, creep=0.25))[:4]
+    [(0, 0, 0, 4, 0.0), (0, 0, 1, 1, 0.0), (0, 0, 2, 0, 0.0), (0, 0, 3, 0, 0.0)]
+    >>> [p for s, d, i, p, c in iter_imposition(8, nup=4)]
+    [8, 1, 6, 3, 4, 5, 2, 7]
+    >>> list(iter_imposition(0))
+    []
+
+    Pages p and p+1 (p odd) back each other; the slot behind slot i of the
+    front is slot nup-1-i of the back:
+
+    >>> page = dict(((s, d, i), p) for s, d, i, p, c in
+    ...             iter_imposition(24, 8, nup=6))
+    >>> backs = sorted(sorted([page[s, 0, i], page[s, 1, 5 - i]])
+    ...                for s, d, i in page if d == 0)
+    >>> backs[:3], all(b == a + 1 and a % 2 for a, b in backs)
+    ([[1, 2], [3, 4], [5, 6]], True)
+    """
+    assert nup % 2 == 0
+    k = nup / 2
+    folded = _folded(n, signature)
+    for sheet in xrange(sheet_count(n, signature, nup)):
+        group = [next(folded, None) for j in xrange(k)]
+        for side in (0, 1):
+            for j, f in enumerate(group if side == 0 else group[::-1]):
+                if f is None:
+                    for slot in (0, 1):
+                        yield sheet, side, 2*j + slot, 0, 0.
+                    continue
+                base, S, i = f
+                s = 2 * i
+                pages = (S - s, s + 1) if side == 0 else (s + 2, S - 1 - s)
+                for slot, p in enumerate(pages):
+                    p += base
+                    yield sheet, side, 2*j + slot, p if p <= n else 0, creep*i
+
+
+def imposition(n, signature=None, nup=2, creep=0.):
+    """Return arrays (sheet, side, slot, page, shift) of every page (1 to the
+    number of padded pages), computed at once; pages > n are blanks.
+
+    Example
+    -------
+    >>> sheet, side, slot, page, shift = imposition(11)
+    >>> sheet.tolist(), side.tolist(), slot.tolist()
+    ([0, 0, 1, 1, 2, 2, 2, 2, 1, 1, 0, 0], [0, 1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0], [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0])
+    >>> sheet, side, slot, page, shift = imposition(40, 16, creep=0.25)
+    >>> sheet[[0, 7, 8, 16]].tolist(), shift[[0, 7, 8]].tolist()
+    ([0, 3, 3, 4], [0.0, 0.75, 0.75])
+    >>> a = imposition(24, 8, nup=6)
+    >>> zip(*[x.tolist() for x in a][:4]) == [
+    ...     page_slot(p, 24, 8, nup=6) + (p,) for p in range(1, 25)]
+    True
+    >>> len(imposition(0)[3])
+    0
+    """
     import numpy as np
-    even = np.array(zip(h,t))[np.arange(N/2)%2==1].flatten()
-    odd  = np.array(zip(t,h))[np.arange(N/2)%2==0].flatten()
-    return odd, even
+    assert nup % 2 == 0
+    sizes = _signatures(n, signature)
+    p = np.arange(1, sum(sizes) + 1)
+    size = sizes[0] if sizes else 4
+    base = (p - 1) // size * size
+    S = np.minimum(size, sum(sizes) - base)
+    q = p - base
+    right = q > S // 2
+    q = np.where(right, S + 1 - q, q)
+    side = (q - 1) % 2
+    pos = np.where(right, side, side ^ 1)
+    i = (q - 1) // 2                    # the folded sheet in its signature
+    folded = base // 4 + i
+    k = nup // 2
+    j = np.where(side, k - 1 - folded % k, folded % k)
+    return folded // k, side, j * 2 + pos, p, creep * i
+
 
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
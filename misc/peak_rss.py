@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Peak memory of benchmark steps, measured in fresh processes
+
+The peak resident set size (ru_maxrss) is a high-water mark of a process: it
+never goes down. The memory of a step is thus the growth of the peak over a
+baseline taken right before the step, and only steps that allocate more than
+all former ones show up; run each case in a fresh process by isolated, and
+take the baseline before anything of the case is allocated.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import sys
+import multiprocessing
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+
+def max_rss():
+    """Return the peak resident set size of this process in bytes, or None
+    where it is unknown.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return rss
+    return rss * 1024
+
+
+def peak_growth(func, *args):
+    """Return (func(*args), the bytes of the peak RSS growth over the peak
+    before the call, or None where it is unknown).
+
+    Example
+    -------
+    >>> result, mem = peak_growth(sum, xrange(10))
+    >>> result, mem is None or mem >= 0
+    (45, True)
+    """
+    rss0 = max_rss()
+    result = func(*args)
+    if rss0 is None:
+        return result, None
+    return result, max_rss() - rss0
+
+
+def isolated(func, *args):
+    """Return func(*args) called in a fresh worker process; func and args
+    must be picklable, e.g., func is a function of a module.
+
+    Example
+    -------
+    >>> isolated(pow, 2, 10)
+    1024
+    """
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        return pool.apply(func, args)
+    finally:
+        pool.close()
+        pool.join()
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -333,6 +333,282 @@ def generate_move_table(cycles):
     lines += ['};']
     return lines
 
+
+def canonical_cycle(cycle):
+    """Return a cycle rotated to start with its least element.
+
+    Example
+    -------
+    >>> canonical_cycle([5, 7, 8, 4, 2, 1])
+    [1, 5, 7, 8, 4, 2]
+    """
+    i = cycle.index(min(cycle))
+    return cycle[i:] + cycle[:i]
+
+
+def block_cycles(cycles):
+    """Group the nontrivial cycles of a permutation into blocks of translated
+    cycles.
+
+    A cycle c' is a translation of a cycle c if c'[i] == c[i] + 1 for all i.
+    A run of k such cycles moves k consecutive elements to k consecutive
+    elements at every step of the follow-the-cycles algorithm, and thus can
+    be moved as a block (memcpy). Return a list of (cycle, width) tuples.
+
+    Example
+    -------
+    >>> one_line = [(i + 3) % 12 for i in range(12)]   # rotate left by 3
+    >>> block_cycles(cycles_from_one_line(one_line))
+    [([0, 9, 6, 3], 3)]
+    >>> block_cycles([[0], [1, 5, 7, 8, 4, 2], [3, 6], [9]])
+    [([1, 5, 7, 8, 4, 2], 1), ([3, 6], 1)]
+    """
+    canon = sorted(canonical_cycle(c) for c in cycles if len(c)>1)
+    unused = set(tuple(c) for c in canon)
+    blocks = []
+    for cycle in canon:
+        key = tuple(cycle)
+        if key not in unused:
+            continue
+        unused.remove(key)
+        k = 1
+        while True:
+            key = tuple(x + k for x in cycle)
+            if key not in unused:
+                break
+            unused.remove(key)
+            k += 1
+        blocks.append((cycle, k))
+    return blocks
+
+
+def block_moves(cycles):
+    """Return the block moves (src, dst, len) of a permutation in cycle
+    notation.
+
+    The moves follow the same order as generate_move_table(), but translated
+    cycles are merged into block moves; n (the number of elements) means the
+    beginning of the temporary block.
+
+    Example
+    -------
+    >>> one_line = [(i + 3) % 12 for i in range(12)]   # rotate left by 3
+    >>> block_moves(cycles_from_one_line(one_line))
+    [(0, 12, 3), (3, 0, 3), (6, 3, 3), (9, 6, 3), (12, 9, 3)]
+    """
+    n = sum(len(c) for c in cycles)
+    moves = []
+    for cycle, k in block_cycles(cycles):
+        L = len(cycle)
+        moves.append((cycle[0], n, k))
+        for i in xrange(L - 1, 0, -1):
+            moves.append((cycle[i], cycle[(i+1) % L], k))
+        moves.append((n, cycle[1], k))
+    return moves
+
+
+def generate_block_move_table(cycles):
+    """Generate the block move table of a permutation in cycle notation.
+
+    Each entry is {src, dst, len}, i.e., a memcpy() of len elements.
+
+    Example
+    -------
+    >>> one_line = [(i + 3) % 12 for i in range(12)]   # rotate left by 3
+    >>> print '\\n'.join(generate_block_move_table(cycles_from_one_line(one_line)))
+    // 12 means the temporary block of 3 element(s)
+    // {src, dst, len}
+    {
+        { 0, 12,  3},
+        { 3,  0,  3},
+        { 6,  3,  3},
+        { 9,  6,  3},
+        {12,  9,  3},
+    };
+    """
+    n = sum(len(c) for c in cycles)
+    moves = block_moves(cycles)
+    width = max([k for s, d, k in moves] + [1])
+    lines = ['// %u means the temporary block of %u element(s)' % (n, width)]
+    lines += ['// {src, dst, len}']
+    lines += ['{']
+    lines += ['    {%2u, %2u, %2u},' % m for m in moves]
+    lines += ['};']
+    return lines
+
+#------------------------------------------------------------------------------
+# Compact encoding of move tables
+#------------------------------------------------------------------------------
+
+def _varint(x):
+    """Return the LEB128 bytes of an unsigned integer."""
+    out = []
+    while x >= 0x80:
+        out.append((x & 0x7F) | 0x80)
+        x >>= 7
+    out.append(x)
+    return out
+
+
+def _zigzag(x):
+    """Map a signed integer to an unsigned one (0, -1, 1, -2, ...)."""
+    if x < 0:
+        return -2*x - 1
+    return 2*x
+
+
+def _unzigzag(x):
+    if x & 1:
+        return -(x + 1) / 2
+    return x / 2
+
+
+def encode_cycles(cycles):
+    """Return a delta-coded byte list of a permutation in cycle notation.
+
+    Every block of translated cycles (see block_cycles) is encoded as the
+    varints of: its length L, its width k, its first element, and the L-1
+    zigzag deltas between successive elements. A zero length ends the table.
+    Since the follow-the-cycles moves of a cycle are fully determined by its
+    elements, this is all the firmware needs to replay the move table.
+
+    Example
+    -------
+    >>> encode_cycles([[0], [1, 5, 7, 8, 4, 2], [3, 6], [9]])
+    [6, 1, 1, 8, 4, 2, 7, 3, 2, 1, 3, 6, 0]
+    """
+    data = []
+    for cycle, k in block_cycles(cycles):
+        data += _varint(len(cycle)) + _varint(k) + _varint(cycle[0])
+        for a, b in zip(cycle, cycle[1:]):
+            data += _varint(_zigzag(b - a))
+    data += _varint(0)
+    return data
+
+
+def decode_cycles(data):
+    """Return the (cycle, width) blocks from the output of encode_cycles().
+
+    Example
+    -------
+    >>> decode_cycles(encode_cycles([[0], [1, 5, 7, 8, 4, 2], [3, 6], [9]]))
+    [([1, 5, 7, 8, 4, 2], 1), ([3, 6], 1)]
+    """
+    def read():
+        x, shift = 0, 0
+        while True:
+            b = data[pos[0]]
+            pos[0] += 1
+            x |= (b & 0x7F) << shift
+            if b < 0x80:
+                return x
+            shift += 7
+
+    pos = [0]
+    blocks = []
+    L = read()
+    while L:
+        k = read()
+        cycle = [read()]
+        for i in xrange(L - 1):
+            cycle.append(cycle[-1] + _unzigzag(read()))
+        blocks.append((cycle, k))
+        L = read()
+    return blocks
+
+
+def permute_with_encoded_cycles(seq, data):
+    """Permute a sequence in place with a delta-coded table of encode_cycles().
+
+    This is a reference of the decoding loop of the firmware.
+
+    Example
+    -------
+    >>> seq = range(12)
+    >>> one_line = [(i + 3) % 12 for i in range(12)]   # rotate left by 3
+    >>> permute_with_encoded_cycles(seq, encode_cycles(cycles_from_one_line(one_line)))
+    >>> seq == permute_with_one_line(range(12), one_line)
+    True
+    """
+    for cycle, k in decode_cycles(data):
+        L = len(cycle)
+        tmp = seq[cycle[0]:cycle[0]+k]
+        for i in xrange(L - 1, 0, -1):
+            d, s = cycle[(i+1) % L], cycle[i]
+            seq[d:d+k] = seq[s:s+k]
+        seq[cycle[1]:cycle[1]+k] = tmp
+
+
+def generate_encoded_move_table(cycles, per_line=12):
+    """Generate the C byte array of the delta-coded table of a permutation in
+    cycle notation.
+
+    Example
+    -------
+    >>> print '\\n'.join(generate_encoded_move_table([[0], [1, 2], [3]]))
+    // 5 bytes; blocks of {L, k, first, deltas...}, ended with 0
+    {
+        0x02, 0x01, 0x01, 0x02, 0x00,
+    };
+    """
+    data = encode_cycles(cycles)
+    lines = ['// %u bytes; blocks of {L, k, first, deltas...}, ended with 0'
+             % len(data)]
+    lines += ['{']
+    for i in xrange(0, len(data), per_line):
+        lines += ['    ' + ' '.join('0x%02X,' % b for b in data[i:i+per_line])]
+    lines += ['};']
+    return lines
+
+
+def _index_size(n):
+    """Return the size in bytes of the least C unsigned type to index n."""
+    if n < 0x100:
+        return 1
+    if n < 0x10000:
+        return 2
+    return 4
+
+
+def move_table_stats(cycles):
+    """Return the sizes and the move counts of the move tables of a
+    permutation in cycle notation.
+
+    Keys of the returned dictionary
+    -------------------------------
+    elements        the number of elements of the permutation
+    element_moves   the number of moved elements (the same for all tables)
+    pair_moves      the number of moves of generate_move_table()
+    pair_bytes      the table size of generate_move_table()
+    block_moves     the number of (memcpy) moves of generate_block_move_table()
+    block_bytes     the table size of generate_block_move_table()
+    encoded_bytes   the table size of generate_encoded_move_table()
+    temp_elements   the size of the temporary block
+
+    Example
+    -------
+    >>> one_line = [(i + 3) % 12 for i in range(12)]   # rotate left by 3
+    >>> stats = move_table_stats(cycles_from_one_line(one_line))
+    >>> [stats[k] for k in ('pair_moves', 'block_moves', 'element_moves')]
+    [15, 5, 15]
+    >>> [stats[k] for k in ('pair_bytes', 'block_bytes', 'encoded_bytes')]
+    [30, 15, 7]
+    """
+    n = sum(len(c) for c in cycles)
+    moves = block_moves(cycles)
+    width = max([k for s, d, k in moves] + [1])
+    pair_moves = sum(len(c) + 1 for c in cycles if len(c)>1)
+    return {
+        'elements': n,
+        'element_moves': sum(k for s, d, k in moves),
+        'pair_moves': pair_moves,
+        'pair_bytes': 2 * pair_moves * _index_size(n),
+        'block_moves': len(moves),
+        'block_bytes': 3 * len(moves) * _index_size(n + width),
+        'encoded_bytes': len(encode_cycles(cycles)),
+        'temp_elements': width,
+    }
+
 #------------------------------------------------------------------------------
 # Apply Permutations to Picture Rotations
 #------------------------------------------------------------------------------
@@ -461,6 +737,10 @@ def print_rotate_move_table(w, h, pred_of_rotate):
     cycles = cycles_from_one_line(one_line)
     lines = generate_move_table(cycles)
     print '\n'.join(lines)
+    stats = move_table_stats(cycles)
+    print '// %(pair_moves)u moves in %(pair_bytes)u bytes;' % stats,
+    print '%(block_moves)u block moves in %(block_bytes)u bytes;' % stats,
+    print '%(encoded_bytes)u bytes delta-coded' % stats
 
 def print_rotate_move_tables():
     print
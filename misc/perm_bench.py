@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the strategies to apply a permutation in perm.py
+
+Every strategy is timed on even-odd, rotate90 and random permutations of n
+elements, n = 10**2 ... 10**max_exp. Each case runs in a fresh worker process,
+and its peak memory is the peak RSS (a high-water mark of the process) over a
+baseline taken before the table is prepared.
+The report is a JSON document that can be tracked between releases.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import sys
+import getopt
+import json
+import time
+import random
+import platform
+from functools import partial
+
+import perm
+from peak_rss import max_rss, isolated
+
+
+#------------------------------------------------------------------------------
+# Permutations
+#------------------------------------------------------------------------------
+
+def even_odd(n):
+    """Return the pred and succ functions of an even-odd permutation of about
+    n elements, and the exact number of elements.
+    """
+    pred = partial(perm.pred_of_even_odd, n=n)
+    succ = partial(perm.succ_of_even_odd, n=n)
+    return pred, succ, n
+
+
+def rotate90(n):
+    """Return the pred and succ functions of a rotation 90 degree clockwise
+    of a w*h ~= n picture, and the exact number of elements.
+    """
+    w = max(int(n ** 0.5), 1)
+    h = n / w
+    pred = partial(perm.pred_of_rotate90cw, w=w, h=h)
+    succ = partial(perm.succ_of_rotate90cw, w=w, h=h)
+    return pred, succ, w*h
+
+
+def shuffled(n, seed=0):
+    """Return the pred and succ functions of a random permutation of n
+    elements, and the exact number of elements.
+    """
+    line = range(n)
+    random.Random(seed).shuffle(line)
+    inv = [0] * n
+    for i, x in enumerate(line):
+        inv[x] = i
+    return line.__getitem__, inv.__getitem__, n
+
+
+PERMUTATIONS = {
+    'even_odd': even_odd,
+    'rotate90': rotate90,
+    'random': shuffled,
+}
+
+#------------------------------------------------------------------------------
+# Strategies
+#------------------------------------------------------------------------------
+# Each strategy is a pair of functions: prepare(pred, succ, n) returns the
+# table the strategy needs (not timed as the apply step), and apply(seq, table)
+# permutes seq and returns the result.
+
+def _prepare_one_line(pred, succ, n):
+    return [pred(i) for i in xrange(n)]
+
+
+def _apply_one_line(seq, line):
+    return perm.permute_with_one_line(seq, line)
+
+
+def _prepare_cycles(pred, succ, n):
+    return perm.cycles_from_one_line([pred(i) for i in xrange(n)])
+
+
+def _apply_cycles(seq, cycles):
+    perm.permute_with_cycles(seq, cycles)
+    return seq
+
+
+def _prepare_pred_succ(pred, succ, n):
+    return pred, succ
+
+
+def _apply_pred_succ(seq, funcs):
+    perm.permute_with_pred_and_succ(seq, *funcs)
+    return seq
+
+
+def _prepare_encoded(pred, succ, n):
+    cycles = perm.cycles_from_one_line([pred(i) for i in xrange(n)])
+    return perm.encode_cycles(cycles)
+
+
+def _apply_encoded(seq, data):
+    perm.permute_with_encoded_cycles(seq, data)
+    return seq
+
+
+STRATEGIES = {
+    'one_line': (_prepare_one_line, _apply_one_line),
+    'cycles': (_prepare_cycles, _apply_cycles),
+    'pred_succ': (_prepare_pred_succ, _apply_pred_succ),
+    'encoded_cycles': (_prepare_encoded, _apply_encoded),
+}
+
+
+def count_moves(strategy, pred, n):
+    """Return (element moves, block moves) of a strategy: the element moves
+    are reads into a temporary or writes into the sequence, and the block
+    moves are the memcpy() calls of encoded_cycles, or None for the others.
+
+    Example
+    -------
+    >>> pred, succ, n = even_odd(10)
+    >>> [count_moves(s, pred, n) for s in sorted(STRATEGIES)]
+    [(10, None), (10, 10), (10, None), (14, None)]
+    >>> rotate3 = lambda i: (i + 3) % 12
+    >>> [count_moves(s, rotate3, 12) for s in ('cycles', 'encoded_cycles')]
+    [(15, None), (15, 5)]
+    """
+    if strategy == 'one_line':
+        return n, None
+    cycles = perm.cycles_from_one_line([pred(i) for i in xrange(n)])
+    if strategy == 'encoded_cycles':
+        moves = perm.block_moves(cycles)
+        return sum(k for s, d, k in moves), len(moves)
+    moves = sum(len(c) + 1 for c in cycles if len(c)>1)
+    if strategy == 'pred_succ':     # fixed points are saved and restored
+        moves += 2 * sum(1 for c in cycles if len(c) == 1)
+    return moves, None
+
+#------------------------------------------------------------------------------
+# Runner
+#------------------------------------------------------------------------------
+
+def run_case(case):
+    """Run a (strategy, permutation, n) case and return its record.
+
+    Example
+    -------
+    >>> r = run_case(('encoded_cycles', 'even_odd', 10))
+    >>> r['ok'], r['n'], r['moves'], r['block_moves']
+    (True, 10, 10, 10)
+    """
+    strategy, permutation, n = case
+    pred, succ, n = PERMUTATIONS[permutation](n)
+    prepare, apply_ = STRATEGIES[strategy]
+
+    rss0 = max_rss()
+    t0 = time.time()
+    table = prepare(pred, succ, n)
+    t1 = time.time()
+    rss1 = max_rss()
+    seq = range(n)
+    t2 = time.time()
+    seq = apply_(seq, table)
+    t3 = time.time()
+    rss2 = max_rss()
+
+    ok = all(seq[i] == pred(i) for i in xrange(n))
+    moves, block_moves = count_moves(strategy, pred, n)
+    return {
+        'strategy': strategy,
+        'permutation': permutation,
+        'n': n,
+        'prepare_sec': t1 - t0,
+        'apply_sec': t3 - t2,
+        'sec_per_element': (t3 - t2) / n,
+        'prepare_peak_bytes': None if rss0 is None else rss1 - rss0,
+        'peak_bytes': None if rss0 is None else rss2 - rss0,
+        'moves': moves,
+        'block_moves': block_moves,
+        'ok': ok,
+    }
+
+
+def estimate_sec(secs, growth=10):
+    """Return the estimated seconds of the next run, of growth times the
+    elements of the last one, from the seconds of the former runs: the time
+    grows as much as it did over the last two runs, and at least linearly.
+
+    Example
+    -------
+    >>> estimate_sec([0.12, 12.]), estimate_sec([1., 2.]), estimate_sec([])
+    (1200.0, 20.0, 0.0)
+    """
+    if not secs:
+        return 0.
+    ratio = growth
+    if len(secs) >= 2 and secs[-2] > 0:
+        ratio = max(ratio, secs[-1] / secs[-2])
+    return secs[-1] * ratio
+
+
+def benchmark(strategies=None, permutations=None, min_exp=2, max_exp=8,
+              time_limit=60., log=None):
+    """Return the benchmark report as a dictionary.
+
+    A strategy is not run on a larger n of a permutation once its run is
+    estimated to take more than time_limit seconds (see estimate_sec); that
+    is the way to get through n = 10**8 with the quadratic strategies in the
+    list. The skipped cases are listed with their estimates in the report.
+    """
+    strategies = strategies or sorted(STRATEGIES)
+    permutations = permutations or sorted(PERMUTATIONS)
+    records, skipped = [], []
+    for p in permutations:
+        for s in strategies:
+            secs = []
+            for e in xrange(min_exp, max_exp + 1):
+                est = estimate_sec(secs)
+                if est > time_limit:
+                    skipped.append({'strategy': s, 'permutation': p,
+                                    'n': 10 ** e, 'estimated_sec': est})
+                    if log:
+                        log.write('%s %s n=%u: skipped (%.3g sec estimated)'
+                                  '\n' % (p, s, 10 ** e, est))
+                    break
+                r = isolated(run_case, (s, p, 10 ** e))
+                records.append(r)
+                secs.append(r['apply_sec'])
+                if log:
+                    log.write('%(permutation)s %(strategy)s n=%(n)u: '
+                              '%(apply_sec).6f sec\n' % r)
+    return {
+        'version': __version__,
+        'perm_revision': perm.__revision__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'records': records,
+        'skipped': skipped,
+    }
+
+#------------------------------------------------------------------------------
+
+def usage():
+    print """\
+Usage: perm_bench [option]
+
+Option:
+    -e EXP, --max-exp=EXP   bench n up to 10**EXP (8 is the default).
+    -s S,.., --strategy=S,..
+                            strategies to bench: %s.
+    -p P,.., --permutation=P,..
+                            permutations to bench: %s.
+    -t SEC, --time-limit=SEC
+                            stop growing n of a strategy once its next run
+                            is estimated to take more than SEC seconds (60
+                            is the default).
+    -o FILE, --output=FILE  write the JSON report to FILE instead of stdout.
+    -h, --help              show this help message and exit.
+    -v, --version           show version info. and exit.""" % (
+        ', '.join(sorted(STRATEGIES)), ', '.join(sorted(PERMUTATIONS)))
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "he:s:p:t:o:v",
+                                   ["help", "max-exp=", "strategy=",
+                                    "permutation=", "time-limit=", "output=",
+                                    "version"])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    if args != []:
+        usage()
+        return 0
+
+    kw = {}
+    output = None
+    for o, a in opts:
+        if o in ("-e", "--max-exp"):
+            kw['max_exp'] = int(a)
+        elif o in ("-s", "--strategy"):
+            kw['strategies'] = a.split(',')
+        elif o in ("-p", "--permutation"):
+            kw['permutations'] = a.split(',')
+        elif o in ("-t", "--time-limit"):
+            kw['time_limit'] = float(a)
+        elif o in ("-o", "--output"):
+            output = a
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        elif o in ("-v", "--version"):
+            print "Permutation Benchmark version", __version__
+            print "by ", __author__
+            print __date__
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    report = benchmark(log=sys.stderr, **kw)
+    text = json.dumps(report, indent=1, sort_keys=True)
+    if output:
+        open(output, 'w').write(text)
+    else:
+        print text
+
+
+if __name__ == '__main__':
+    sys.exit(main())
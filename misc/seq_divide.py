@@ -1,3 +1,20 @@
+"""
+Divide sequences into chunks.
+
+d0, seq_divide and seq_divide1 return lists of copies; chunks and parts
+yield chunks lazily, and zero-copy views of buffers if asked.
+"""
+import sys
+import time
+import mmap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from peak_rss import peak_growth, isolated
+
 
 def d0(seq, mod):
     a, b = 0, mod
@@ -28,7 +45,168 @@ def seq_divide1(seq, mod):
     return [seq[x:x+mod] for x in xrange(0, len(seq), mod)]
 
 
+#------------------------------------------------------------------------------
+# Lazy chunking with zero-copy views
+#------------------------------------------------------------------------------
+
+def _slicer(seq, view=False):
+    """Return a function of (a, b) -> seq[a:b], or a zero-copy view of it
+    if view: ndarray slices, memoryviews, or read-only buffers of mmaps and
+    of objects of the old buffer interface with an itemsize (e.g., array).
+    Other sequences, unicode included, are sliced.
+    """
+    if not view or (np is not None and isinstance(seq, np.ndarray)):
+        return lambda a, b: seq[a:b]
+    try:
+        mv = memoryview(seq)
+        return lambda a, b: mv[a:b]
+    except TypeError:
+        pass
+    size = 1 if isinstance(seq, mmap.mmap) else getattr(seq, 'itemsize', None)
+    if not isinstance(size, int) or isinstance(seq, unicode):
+        return lambda a, b: seq[a:b]
+    try:
+        buffer(seq, 0, 0)
+    except TypeError:
+        return lambda a, b: seq[a:b]
+    return lambda a, b: buffer(seq, a*size, (b - a)*size)
+
+
+def chunks(seq, size, step=None, view=False):
+    """Yield chunks of size items of seq, starting every step items.
+
+    Arguments
+    ---------
+    seq     a sequence, e.g., a string, a list, a bytearray or an ndarray
+    size    the number of items per chunk; the last one may be shorter
+    step    the distance between the starts of chunks; size by default,
+            less than size for overlapped chunks, and greater for gaps
+    view    yield zero-copy views of buffer types instead of copies; other
+            sequences are sliced as usual. The views of an array.array are
+            buffers of its bytes: their len() is in bytes, not items
+
+    Example
+    -------
+    >>> list(chunks('abcdefghijklmnopqr', 4))
+    ['abcd', 'efgh', 'ijkl', 'mnop', 'qr']
+    >>> list(chunks('abcdefg', 4, 2))
+    ['abcd', 'cdef', 'efg']
+    >>> [v.tobytes() for v in chunks(bytearray('abcdefg'), 3, view=True)]
+    ['abc', 'def', 'g']
+    >>> list(chunks([1, 2, 3], 2, view=True))
+    [[1, 2], [3]]
+    >>> list(chunks(u'abcdef', 4, view=True))
+    [u'abcd', u'ef']
+    >>> from array import array
+    >>> [(len(v), array('h', str(v)).tolist())
+    ...  for v in chunks(array('h', range(5)), 3, view=True)]
+    [(6, [0, 1, 2]), (4, [3, 4])]
+    """
+    if step is None:
+        step = size
+    assert size > 0 and step > 0
+    n = len(seq)
+    piece = _slicer(seq, view)
+    start = 0
+    while start < n:
+        yield piece(start, start + size)
+        if start + size >= n:
+            break
+        start += step
+
+
+def parts(seq, n, view=False):
+    """Yield n chunks of seq whose sizes differ by at most one; the first
+    ones are the longer ones.
+
+    Example
+    -------
+    >>> list(parts('abcdefghij', 3))
+    ['abcd', 'efg', 'hij']
+    >>> list(parts(range(2), 3))
+    [[0], [1], []]
+    """
+    assert n > 0
+    q, r = divmod(len(seq), n)
+    piece = _slicer(seq, view)
+    start = 0
+    for i in xrange(n):
+        end = start + q + (i < r)
+        yield piece(start, end)
+        start = end
+
+
+#------------------------------------------------------------------------------
+# Benchmark
+#------------------------------------------------------------------------------
+
+DIVIDERS = {
+    'd0': d0,
+    'seq_divide': seq_divide,
+    'seq_divide1': seq_divide1,
+    'chunks': lambda seq, mod: chunks(seq, mod),
+    'chunks_view': lambda seq, mod: chunks(seq, mod, view=True),
+}
+
+
+# the types of sequences to divide; every divider gets each of them
+SEQUENCES = {
+    'str': lambda size: '\0' * size,
+    'bytearray': bytearray,
+}
+
+
+def measure(args):
+    """Return (seconds, bytes of peak RSS growth) to divide a sequence (see
+    SEQUENCES) of mbytes MB into chunks of mod bytes and walk them; run it
+    in a fresh process.
+    """
+    name, kind, mbytes, mod = args
+    seq = SEQUENCES[kind](mbytes << 20)
+    t = time.time()
+    total, mem = peak_growth(_walk, DIVIDERS[name], seq, mod)
+    sec = time.time() - t
+    assert total == len(seq)
+    return sec, mem
+
+
+def _walk(divide, seq, mod):
+    """Return the total size of the chunks of a divider."""
+    total = 0
+    for c in divide(seq, mod):
+        total += len(c)
+    return total
+
+
+def benchmark(names=sorted(DIVIDERS), mbytes=64, mods=(4096, 1 << 20),
+              kinds=sorted(SEQUENCES)):
+    """Measure dividers on the same kinds of sequences in fresh processes
+    and return records of (mod, kind, name, seconds, bytes of peak RSS
+    growth).
+    """
+    records = []
+    for mod in mods:
+        for kind in kinds:
+            for name in names:
+                sec, mem = isolated(measure, (name, kind, mbytes, mod))
+                records.append((mod, kind, name, sec, mem))
+    return records
+
+
+def print_benchmark(names=sorted(DIVIDERS), mbytes=64, mods=(4096, 1 << 20)):
+    """Print the time and peak memory growth of dividers on sequences of
+    mbytes MB.
+    """
+    print '%8s %-10s %-12s %10s %12s' % ('mod', 'sequence', 'divider', 'ms',
+                                         'MB')
+    for mod, kind, name, sec, mem in benchmark(names, mbytes, mods):
+        mem = '-' if mem is None else '%.1f' % (mem / 1048576.)
+        print '%8u %-10s %-12s %10.1f %12s' % (mod, kind, name, sec*1e3, mem)
+        sys.stdout.flush()
+
+
 if __name__ == "__main__":
-    print d0('abcdefghijklmnopqr', 4)
-    print seq_divide('abcdefghijklmnopqr', 4)
-    print seq_divide1('abcdefghijklmnopqr', 4)
+    import doctest
+    failures, tests = doctest.testmod()
+    if failures == 0:
+        print_benchmark(mbytes=int((sys.argv[1:] or [64])[0]))
@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 """
 This tool generates char list with varied encodes
+
+Single-byte and multi-byte (e.g., Big5, GBK, Shift-JIS and EUC-KR) encodes
+are listed by ranges of lead and trail bytes; each block of a lead byte is
+decoded at once. Other Python codecs are probed for their valid bytes.
 """
 __software__ = "Char Listing Tool"
-__version__ = "1.0"
+__version__ = "1.1"
 __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
-__date__ = "2009/08/04 (initial version)"
+__date__ = "2009/08/04 (initial version); 2026/10/19 (multi-byte codecs)"
+
+import os
+import sys
+import codecs
+import getopt
+import unicodedata
+from multiprocessing import Pool
 
 
 def divide(sequence, modulus=32):
@@ -49,32 +60,262 @@ Tbl = {
             (0x91, 0x9D), (0x9E, 0xA0),
             (0xA0, 0x0100)
         )
-    }
+    },
+    'big5': {
+        'head': [
+            '# Big5 (Traditional Chinese)',
+            '# ref. http://en.wikipedia.org/wiki/Big5'
+        ],
+        'code': 'big5',
+        'range': ((0x20, 0x7F),),
+        'lead': ((0xA1, 0xFA),),
+        'trail': ((0x40, 0x7F), (0xA1, 0xFF))
+    },
+    'gbk': {
+        'head': [
+            '# GBK (Simplified Chinese)',
+            '# ref. http://en.wikipedia.org/wiki/GBK'
+        ],
+        'code': 'gbk',
+        'range': ((0x20, 0x7F),),
+        'lead': ((0x81, 0xFF),),
+        'trail': ((0x40, 0x7F), (0x80, 0xFF))
+    },
+    'sjis': {
+        'head': [
+            '# Shift JIS (Japanese)',
+            '# ref. http://en.wikipedia.org/wiki/Shift_JIS'
+        ],
+        'code': 'shift_jis',
+        'range': ((0x20, 0x7F), (0xA1, 0xE0)),
+        'lead': ((0x81, 0xA0), (0xE0, 0xF0)),
+        'trail': ((0x40, 0x7F), (0x80, 0xFD))
+    },
+    'euckr': {
+        'head': [
+            '# EUC-KR (Korean)',
+            '# ref. http://en.wikipedia.org/wiki/Extended_Unix_Code'
+        ],
+        'code': 'euc-kr',
+        'range': ((0x20, 0x7F),),
+        'lead': ((0xA1, 0xFF),),
+        'trail': ((0xA1, 0xFF),)
+    },
 }
 
 
-def save_printable_chars(char_set='latin1'):
+def is_printable(u):
+    """Return True if a unicode char is not a control, surrogate, private
+    use or unassigned one.
+
+    Example
+    -------
+    >>> is_printable(u'A'), is_printable(u'\\x85'), is_printable(u'\\ue000')
+    (True, False, False)
+    """
+    return unicodedata.category(u) not in ('Cc', 'Cs', 'Co', 'Cn') and \
+           u != u'�'
+
+
+def probe_table(code):
+    """Return a Tbl entry of any Python codec by probing its single bytes,
+    and lead and trail bytes of two-byte chars.
+
+    Example
+    -------
+    >>> t = probe_table('cp949')
+    >>> t['range'][0], t['lead'][0], t['trail'][0]
+    ((32, 127), (129, 201), (65, 91))
+    """
+    def ranges(values):
+        runs = []
+        for v in values:
+            if runs and runs[-1][1] == v:
+                runs[-1][1] = v + 1
+            else:
+                runs.append([v, v + 1])
+        return tuple(tuple(r) for r in runs)
+
+    singles, leads, trails = [], [], set()
+    for b in xrange(0x20, 0x100):
+        try:
+            u = chr(b).decode(code)
+        except UnicodeDecodeError:
+            u = None
+        if u is not None:
+            if len(u) == 1 and is_printable(u):
+                singles.append(b)
+            continue
+        valid = set()
+        for t in xrange(0x100):
+            try:
+                if len((chr(b) + chr(t)).decode(code)) == 1:
+                    valid.add(t)
+            except UnicodeDecodeError:
+                pass
+        if valid:
+            leads.append(b)
+            trails |= valid
+
+    table = {'head': ['# %s' % code], 'code': code, 'range': ranges(singles)}
+    if leads:
+        table['lead'] = ranges(leads)
+        table['trail'] = ranges(sorted(trails))
+    return table
+
+
+def table(char_set):
+    """Return the Tbl entry of a char set, or that probed of a codec."""
+    if char_set in Tbl:
+        return Tbl[char_set]
+    return probe_table(codecs.lookup(char_set).name)
+
+
+def decode_block(code, lead, trails):
+    """Return [(code point of the codec, unicode char)] of the valid
+    two-byte chars of a lead byte and a range (a, b) of trail bytes.
+
+    The block is decoded at once, and char by char only if that fails.
+
+    Example
+    -------
+    >>> [(hex(c), u) for c, u in decode_block('big5', 0xA4, (0x40, 0x43))]
+    [('0xa440', u'\\u4e00'), ('0xa441', u'\\u4e59'), ('0xa442', u'\\u4e01')]
+    """
+    a, b = trails
+    n = b - a
+    raw = bytearray(2 * n)
+    raw[0::2] = chr(lead) * n
+    raw[1::2] = bytearray(xrange(a, b))
+    try:
+        u = str(raw).decode(code)
+    except UnicodeDecodeError:
+        u = None
+    if u is not None and len(u) == n:
+        pairs = zip(xrange(lead << 8 | a, lead << 8 | b), u)
+    else:
+        pairs = []
+        for t in xrange(a, b):
+            try:
+                c = (chr(lead) + chr(t)).decode(code)
+            except UnicodeDecodeError:
+                continue
+            if len(c) == 1:
+                pairs.append((lead << 8 | t, c))
+    return [(c, u) for c, u in pairs if is_printable(u)]
+
+
+def iter_runs(char_set):
+    """Yield (first code point, unicode chars) of the runs of consecutive
+    printable chars of a char set.
+    """
+    tbl = table(char_set)
+    code = tbl['code']
+    for a, b in tbl['range']:
+        yield a, ''.join([chr(x) for x in range(a, b)]).decode(code)
+    for lead_a, lead_b in tbl.get('lead', ()):
+        for lead in xrange(lead_a, lead_b):
+            for trails in tbl['trail']:
+                start, chars = None, []
+                for c, u in decode_block(code, lead, trails):
+                    if chars and c != start + len(chars):
+                        yield start, u''.join(chars)
+                        chars = []
+                    if not chars:
+                        start = c
+                    chars.append(u)
+                if chars:
+                    yield start, u''.join(chars)
+
+
+def save_printable_chars(char_set='latin1', outdir='.'):
     """Generate a printable char list with assigned char_set
     and save it to a file.
+
+    The list is written as it is generated; return (the file name, the
+    number of chars).
     """
-    lines = Tbl[char_set]['head']
-    for a, b in Tbl[char_set]['range']:
-        lines.extend(['', ':0x%02X' % a])
-        b = ''.join([chr(x) for x in range(a, b)])
-        u = b.decode(Tbl[char_set]['code'])
-        lines.extend(divide(u))
-
-    fn = ''.join(['char_', char_set, '.lst'])
-    f = open(fn, 'wb')
-    f.write(u'\r\n'.join(lines).encode('utf16'))
+    fn = os.path.join(outdir, ''.join(['char_', char_set, '.lst']))
+    f = codecs.open(fn, 'wb', 'utf16')
+    f.write(u'\r\n'.join(table(char_set)['head']))
+    count = 0
+    for start, chars in iter_runs(char_set):
+        fmt = u'\r\n\r\n:0x%02X' if start < 0x100 else u'\r\n\r\n:0x%04X'
+        f.write(fmt % start)
+        for line in divide(chars):
+            f.write(u'\r\n' + line)
+        count += len(chars)
     f.close()
+    return fn, count
+
+
+def _save_task(task):
+    return save_printable_chars(*task)
+
+
+def save_all(char_sets, outdir='.', jobs=None):
+    """Save the char lists of char sets in parallel; yield (file name, the
+    number of chars) per char set as they are done.
+    """
+    tasks = [(char_set, outdir) for char_set in char_sets]
+    if jobs == 1 or len(tasks) < 2:
+        for task in tasks:
+            yield _save_task(task)
+        return
+    pool = Pool(jobs)
+    try:
+        for result in pool.imap_unordered(_save_task, tasks):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
 
 
 #------------------------------------------------------------------------------
 
-def main():
-    for char_set in Tbl.keys():
-        save_printable_chars(char_set)
+def usage():
+    print """\
+Usage: char_lst [option] [CHARSET...]
+
+Option:
+    -o DIR, --outdir=DIR    write char_<CHARSET>.lst files into DIR (the
+                            current directory is the default).
+    -j N, --jobs=N          the number of processes (the number of CPUs is
+                            the default).
+    -h, --help              show this help message and exit.
+
+Purpose:
+    Generate printable char lists of char sets: %s, or any
+    Python codec, e.g., cp949. All char sets of the table are listed by
+    default.""" % ', '.join(sorted(Tbl))
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "ho:j:", ["help", "outdir=", "jobs="])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    outdir, jobs = '.', None
+    for o, a in opts:
+        if o in ("-o", "--outdir"):
+            outdir = a
+        elif o in ("-j", "--jobs"):
+            jobs = int(a)
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    for fn, count in save_all(args or Tbl.keys(), outdir, jobs):
+        print '%s: %d chars' % (fn, count)
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+Set algebra of char lists (*.lst) of char_lst.py
+
+A CharSet holds code points as a sorted list of range boundaries over the
+0x110000 space, e.g., [0x20, 0x7F, 0xA0, 0x100] for 0x20-0x7E and 0xA0-0xFF,
+so unions, intersections and differences of char lists of any sizes are
+linear merges of boundaries, and their results are minimized range lists.
+
+Example: the glyphs of a product for Taiwan and Japan that a font lacks
+
+    charset -u char_big5.lst char_sjis.lst | charset -d - font.lst
+"""
+__software__ = "Char Set Algebra Tool"
+__version__ = "1.0"
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+
+import re
+import sys
+import codecs
+import getopt
+from array import array
+from bisect import bisect_right
+
+
+MAX_CODE = 0x110000
+
+_MARK = re.compile(u'^:0x[0-9A-Fa-f]+$')
+
+
+def _combine(x, y, keep):
+    """Return the boundaries of the code points kept by keep(in x, in y),
+    by one merge of the boundaries x and y.
+    """
+    out = array('l')
+    i = j = 0
+    nx, ny = len(x), len(y)
+    inx = iny = cur = False
+    while i < nx or j < ny:
+        p = min(x[i] if i < nx else MAX_CODE, y[j] if j < ny else MAX_CODE)
+        if i < nx and x[i] == p:
+            inx = not inx
+            i += 1
+        if j < ny and y[j] == p:
+            iny = not iny
+            j += 1
+        k = keep(inx, iny)
+        if k != cur:
+            out.append(p)
+            cur = k
+    return out
+
+
+class CharSet(object):
+    """A set of code points as sorted, disjoint and non-adjacent ranges.
+
+    Example
+    -------
+    >>> a = CharSet.from_string(u'abcxyz')
+    >>> b = CharSet.from_ranges([(ord('c'), ord('y'))])
+    >>> a.ranges()
+    [(97, 100), (120, 123)]
+    >>> (a | b).ranges(), (a & b).ranges(), (a - b).ranges()
+    ([(97, 123)], [(99, 100), (120, 121)], [(97, 99), (121, 123)])
+    >>> len(a ^ b), u'y' in a, 0x4E00 in a
+    (24, True, False)
+    """
+
+    def __init__(self, bounds=()):
+        self.bounds = array('l', bounds)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Make a set of [(first, last+1)] ranges in any order."""
+        bounds = array('l')
+        for a, b in sorted(r for r in ranges if r[0] < r[1]):
+            if bounds and a <= bounds[-1]:
+                bounds[-1] = max(bounds[-1], b)
+            else:
+                bounds.extend((a, b))
+        return cls(bounds)
+
+    @classmethod
+    def from_codes(cls, codes):
+        """Make a set of code points in any order."""
+        bounds = array('l')
+        for c in sorted(set(codes)):
+            if bounds and bounds[-1] == c:
+                bounds[-1] = c + 1
+            else:
+                bounds.extend((c, c + 1))
+        return cls(bounds)
+
+    @classmethod
+    def from_string(cls, u):
+        """Make a set of the chars of a unicode string."""
+        return cls.from_codes(ord(c) for c in u)
+
+    @classmethod
+    def load(cls, path):
+        """Load a char list (*.lst) of char_lst.py; '-' is the standard
+        input.
+        """
+        if path == '-':
+            f = codecs.getreader('utf16')(sys.stdin)
+        else:
+            f = codecs.open(path, 'rb', 'utf16')
+        codes = set()
+        marked = False
+        for line in f.read().split(u'\r\n'):
+            if not line or (not marked and line.startswith(u'#')):
+                continue
+            if _MARK.match(line):
+                marked = True
+                continue
+            codes.update(ord(c) for c in line)
+        if f is not sys.stdin:
+            f.close()
+        return cls.from_codes(codes)
+
+    def save(self, path, head=()):
+        """Save the set as a char list (*.lst); a marker line of the first
+        code point starts each range, and '-' is the standard output.
+        """
+        if path == '-':
+            f = codecs.getwriter('utf16')(sys.stdout)
+        else:
+            f = codecs.open(path, 'wb', 'utf16')
+        f.write(u'\r\n'.join(head))
+        for a, b in self.ranges():
+            f.write(u'\r\n\r\n:0x%02X' % a if a < 0x100 else
+                    u'\r\n\r\n:0x%04X' % a)
+            for c in xrange(a, b, 32):
+                f.write(u'\r\n' + u''.join(unichr(x)
+                                           for x in xrange(c, min(c+32, b))))
+        if path != '-':
+            f.close()
+
+    def ranges(self):
+        """Return the [(first, last+1)] ranges."""
+        b = self.bounds
+        return zip(b[0::2], b[1::2])
+
+    def range_list(self):
+        """Return the minimized range list as text lines of hex code points,
+        e.g., 0020-007E, or a single one.
+
+        Example
+        -------
+        >>> print CharSet.from_string(u'abc!').range_list()
+        0021
+        0061-0063
+        """
+        lines = []
+        for a, b in self.ranges():
+            if b - a == 1:
+                lines.append('%04X' % a)
+            else:
+                lines.append('%04X-%04X' % (a, b - 1))
+        return '\n'.join(lines)
+
+    def __len__(self):
+        b = self.bounds
+        return sum(b[1::2]) - sum(b[0::2])
+
+    def __iter__(self):
+        for a, b in self.ranges():
+            for c in xrange(a, b):
+                yield c
+
+    def __contains__(self, c):
+        if isinstance(c, basestring):
+            c = ord(c)
+        return bisect_right(self.bounds, c) % 2 == 1
+
+    def __eq__(self, other):
+        return self.bounds == other.bounds
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __or__(self, other):
+        return CharSet(_combine(self.bounds, other.bounds, lambda x, y: x or y))
+
+    def __and__(self, other):
+        return CharSet(_combine(self.bounds, other.bounds,
+                                lambda x, y: x and y))
+
+    def __sub__(self, other):
+        return CharSet(_combine(self.bounds, other.bounds,
+                                lambda x, y: x and not y))
+
+    def __xor__(self, other):
+        return CharSet(_combine(self.bounds, other.bounds, lambda x, y: x != y))
+
+    def issubset(self, other):
+        return not (self - other).bounds
+
+    def __repr__(self):
+        return 'CharSet(%d chars in %d ranges)' % (len(self),
+                                                   len(self.bounds) / 2)
+
+
+def union(sets):
+    """Return the union of char sets.
+
+    The sets are merged pairwise, so k sets of n ranges take
+    O(n k log k) time.
+
+    Example
+    -------
+    >>> union([CharSet.from_string(s) for s in u'abc']).ranges()
+    [(97, 100)]
+    """
+    sets = list(sets)
+    if not sets:
+        return CharSet()
+    while len(sets) > 1:
+        sets = [sets[i] | sets[i+1] if i + 1 < len(sets) else sets[i]
+                for i in xrange(0, len(sets), 2)]
+    return sets[0]
+
+
+def intersection(sets):
+    """Return the intersection of char sets."""
+    sets = list(sets)
+    result = sets[0]
+    for s in sets[1:]:
+        result = result & s
+    return result
+
+
+def coverage(needed, font):
+    """Return (the ratio of needed chars that a font covers, the set of
+    missing chars).
+
+    Example
+    -------
+    >>> ratio, missing = coverage(CharSet.from_string(u'abcd'),
+    ...                           CharSet.from_string(u'ab'))
+    >>> ratio, missing.ranges()
+    (0.5, [(99, 101)])
+    """
+    missing = needed - font
+    return 1 - len(missing) / float(len(needed) or 1), missing
+
+
+#------------------------------------------------------------------------------
+
+def usage():
+    print """\
+Usage: charset [option] FILE...
+
+Option:
+    -u, --union         the union of the char lists (the default).
+    -i, --intersect     the intersection of the char lists.
+    -d, --diff          the chars of the first char list that are not in the
+                        others, e.g., those a font (the second one) lacks.
+    -r, --ranges        print the result as a range list instead of a char
+                        list.
+    -o FILE             write the char list to FILE instead of the standard
+                        output.
+    -h, --help          show this help message and exit.
+
+Purpose:
+    Combine char lists (*.lst) of char_lst.py; '-' reads a char list from
+    the standard input."""
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "huidro:",
+                                   ["help", "union", "intersect", "diff",
+                                    "ranges"])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    if args == []:
+        usage()
+        return 0
+
+    op, ranges, out = 'union', False, '-'
+    for o, a in opts:
+        if o in ("-u", "--union"):
+            op = 'union'
+        elif o in ("-i", "--intersect"):
+            op = 'intersect'
+        elif o in ("-d", "--diff"):
+            op = 'diff'
+        elif o in ("-r", "--ranges"):
+            ranges = True
+        elif o == "-o":
+            out = a
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    sets = [CharSet.load(path) for path in args]
+    if op == 'union':
+        result = union(sets)
+    elif op == 'intersect':
+        result = intersection(sets)
+    else:
+        result = sets[0] - union(sets[1:])
+
+    head = ['# %s of %s' % (op, ' '.join(args)),
+            '# %d chars in %d ranges' % (len(result), len(result.bounds) / 2)]
+    if ranges:
+        print '\n'.join(head)
+        print result.range_list()
+    else:
+        result.save(out, head)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,15 +4,45 @@ A wrapper of the AJAX Language API
 
 ref. http://code.google.com/apis/ajaxlanguage
 ref. http://code.google.com/p/python-googlelanguage/
+
+Translations are cached by tcache.py in CACHE; back it with a file, e.g.,
+CACHE.open('trans.db'), to keep them across runs, and see CACHE.stats() for
+the hits and misses. detect answers obvious texts locally by langid.py, and
+caches the others in DETECT_CACHE.
+
+Requests go through CLIENT of tclient.py, concurrently over keep-alive
+connections, rate-limited and retried; see configure to point it at another
+server, e.g., a local stand-in for tests, or to tune it.
 """
 __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
 __date__ = "2009/03/03 (initial)"
-__version__ = "1.0"
-
-import urllib
+__version__ = "1.4"
 
 import simplejson
 
+from tcache import TranslationCache, decor_cache
+from langid import decor_classify, lang_key, lang_index
+from tclient import Client
+
+
+URL_BASE = 'http://ajax.googleapis.com/ajax/services/language'
+
+CACHE = TranslationCache(maxsize=4096, ttl=30*24*3600)
+
+DETECT_CACHE = TranslationCache(maxsize=4096, ttl=30*24*3600)
+
+CLIENT = Client(URL_BASE, agent="glang/%s" % __version__)
+
+
+def configure(url=URL_BASE, **kw):
+    """Send requests to the web service at url through a new
+    tclient.Client(url, **kw), e.g., configure(workers=8, rate=10).
+    """
+    global CLIENT
+    CLIENT.close()
+    kw.setdefault('agent', "glang/%s" % __version__)
+    CLIENT = Client(url, **kw)
+
 
 # from http://code.google.com/apis/ajaxlanguage/documentation/reference.html
 _LANG_CODE = {
@@ -135,6 +165,25 @@ def lang_codes():
     return _LANG_CODE.values()
 
 
+_LANG_INDEX = lang_index(_LANG_CODE)
+
+
+def lang_code(lang, default=None):
+    """
+    Return the language code of a language name, code or alias in any case,
+    or default if it is not supported.
+
+    Example
+    -------
+    >>> lang_code("Japanese"), lang_code("FR"), lang_code("Mars")
+    ('ja', 'fr', None)
+    """
+    code = _LANG_INDEX.get(lang)
+    if code is None:
+        code = _LANG_INDEX.get(lang_key(lang), default)
+    return code
+
+
 #------------------------------------------------------------------------------
 # Decorators
 #------------------------------------------------------------------------------
@@ -144,20 +193,10 @@ def decor_name_to_code(func):
     into those of language codes.
     """
     def wrapper(text, src="English", dest="Taiwan"):
-        names = lang_names()
-        codes = lang_codes()
-
-        if src.upper() in names:
-            src = _LANG_CODE[src.upper()]
-        if dest.upper() in names:
-            dest = _LANG_CODE[dest.upper()]
-
-        if src not in codes:
+        src = lang_code(src)
+        if src is None:
             src = detect(text).encode("utf8")
-        if dest not in codes:
-            dest = "en"
-
-        return func(text, src, dest)
+        return func(text, src, lang_code(dest, "en"))
 
     wrapper.__doc__ = func.__doc__
     wrapper.__name__ = func.__name__
@@ -180,11 +219,42 @@ def decor_unicode_to_utf8(func):
     return wrapper
 
 
+#------------------------------------------------------------------------------
+# Responses
+#------------------------------------------------------------------------------
+
+class ResponseParser(object):
+    """A parser of the JSON responses of the web service; the decoder is
+    made once.
+
+    Example
+    -------
+    >>> ResponseParser().parse('{"responseStatus": 200, '
+    ...     '"responseData": {"language": "en"}}', 'language')
+    u'en'
+    """
+
+    def __init__(self):
+        self.decode = simplejson.JSONDecoder().decode
+
+    def parse(self, json, field):
+        """Return a field of the response data of a JSON string."""
+        json = self.decode(json)    # parse the JSON string
+        if json['responseStatus'] == 200:
+            return json['responseData'][field]
+        else:
+            raise Exception('(%(responseStatus)s) %(responseDetails)s' % json)
+
+
+PARSER = ResponseParser()
+
+
 #------------------------------------------------------------------------------
 # Public APIs
 #------------------------------------------------------------------------------
 
 @decor_name_to_code
+@decor_cache(CACHE)
 @decor_unicode_to_utf8
 def translate(text, src="en", dest="zh-TW"):
     """Returns translated text for the given text supplied, matching the
@@ -207,31 +277,23 @@ def translate(text, src="en", dest="zh-TW"):
     >>> translate(u"A bird can fly high.", "en", "fr")
     u'Un oiseau peut voler haut.'
     """
-    URL_BASE = 'http://ajax.googleapis.com/ajax/services/language/translate'
-
     params = {'v': '1.0', 'q': '', 'langpair': ''}
     params['q'] = text
     params['langpair'] = '%s|%s' % (src, dest)
 
-    url = '%s?%s' % (URL_BASE, urllib.urlencode(params))
-    fp = urllib.urlopen(url)
-    json = fp.read()  # get the JSON string
-    fp.close()
-
-    json = simplejson.loads(json)  # parse the JSON string
-
-    if json['responseStatus'] == 200:
-        return json['responseData']['translatedText']
-    else:
-        raise Exception('(%(responseStatus)s) %(responseDetails)s' % json)
-
-    return None
+    json = CLIENT.get('/translate', params)    # get the JSON string
+    return PARSER.parse(json, 'translatedText')
 
 
+@decor_classify(DETECT_CACHE)
 @decor_unicode_to_utf8
 def detect(text):
     """Return the language code that describes the language of the given text.
 
+    Obvious texts, e.g., of kana, Hangul or traditional-only Chinese
+    characters, are classified locally; see detect.local and detect.remote
+    for the counts of local and remote answers.
+
     Arguments
     ---------
     text - The text that is to be translated.
@@ -245,24 +307,28 @@ def detect(text):
     >>> detect("面皮")
     u'zh-CN'
     """
-    URL_BASE = 'http://ajax.googleapis.com/ajax/services/language/detect'
-
     params = {'v': '1.0', 'q': ''}
     params['q'] = text
 
-    url = '%s?%s' % (URL_BASE, urllib.urlencode(params))
-    fp = urllib.urlopen(url)
-    json = fp.read()  # get the JSON string
-    fp.close()
+    json = CLIENT.get('/detect', params)   # get the JSON string
+    return PARSER.parse(json, 'language')
+
 
-    json = simplejson.loads(json)  # parse the JSON string
+def translate_many(texts, src="en", dest="zh-TW"):
+    """Return the list of translated texts of the given texts, in order.
 
-    if json['responseStatus'] == 200:
-        return json['responseData']['language']
-    else:
-        raise Exception('(%(responseStatus)s) %(responseDetails)s' % json)
+    Identical texts are translated once, and the requests are sent
+    concurrently by CLIENT.
 
-    return None
+    Example
+    -------
+    >>> translate_many(["Bonjour Monde", "Au revoir"], "fr", "en")
+    [u'Hello World', u'Goodbye']
+    """
+    unique = list(set(texts))
+    results = CLIENT.map(lambda text: translate(text, src, dest), unique)
+    results = dict(zip(unique, results))
+    return [results[text] for text in texts]
 
 
 #------------------------------------------------------------------------------
@@ -5,13 +5,44 @@ A python wrapper of Google Translate web service.
 This script is re-wrote from Thejaswi Raya's pytranslator for fitting my use.
 For Thejaswi Raya's pytranslator, please see http://thejaswihr.blogspot.com \
 /2009/02/python-google-translator-pytranslator.html.
+
+Translations are cached by tcache.py in CACHE; back it with a file, e.g.,
+CACHE.open('trans.db'), to keep them across runs, and see CACHE.stats() for
+the hits and misses.
+
+translate_many translates many texts in a few requests, e.g., the strings of
+a resource file.
+
+Requests go through CLIENT of tclient.py, concurrently over keep-alive
+connections, rate-limited and retried; see configure to point it at another
+server, e.g., a local stand-in for tests, or to tune it.
 """
 __author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
 __date__ = "2009/03/03 (initial); 2012/05/31(last revision)"
-__version__ = "1.5.1"
+__version__ = "1.9"
 
 import re
-import urllib
+
+from tcache import TranslationCache, decor_cache
+from tclient import Client
+from langid import lang_key, lang_index
+
+
+URL_BASE = 'http://translate.google.com/translate_t'
+
+CACHE = TranslationCache(maxsize=4096, ttl=30*24*3600)
+
+CLIENT = Client(URL_BASE, agent="gtrans/%s" % __version__)
+
+
+def configure(url=URL_BASE, **kw):
+    """Send requests to the web service at url through a new
+    tclient.Client(url, **kw), e.g., configure(workers=8, rate=10).
+    """
+    global CLIENT
+    CLIENT.close()
+    kw.setdefault('agent', "gtrans/%s" % __version__)
+    CLIENT = Client(url, **kw)
 
 
 # from http://code.google.com/apis/ajaxlanguage/documentation/reference.html
@@ -135,6 +166,27 @@ def lang_codes():
     return _LANG_CODE.values()
 
 
+_LANG_INDEX = lang_index(_LANG_CODE)
+
+
+def lang_code(lang, default="auto"):
+    """
+    Return the language code of a language name, code or alias in any case,
+    or default if it is not supported
+
+    Example
+    -------
+    >>> lang_code("Taiwan"), lang_code("zh_tw"), lang_code("Hebrew")
+    ('zh-TW', 'zh-TW', 'iw')
+    >>> lang_code("Mars")
+    'auto'
+    """
+    code = _LANG_INDEX.get(lang)
+    if code is None:
+        code = _LANG_INDEX.get(lang_key(lang), default)
+    return code
+
+
 #------------------------------------------------------------------------------
 # Decorators
 #------------------------------------------------------------------------------
@@ -143,20 +195,7 @@ def decor_name_to_code(func):
     """A decorator that converts arguments of language names
     into those of language codes."""
     def wrapper(text, src="English", dest="Taiwan"):
-        names = lang_names()
-        codes = lang_codes()
-
-        if src.upper() in names:
-            src = _LANG_CODE[src.upper()]
-        if dest.upper() in names:
-            dest = _LANG_CODE[dest.upper()]
-
-        if src not in codes:
-            src = "auto"
-        if dest not in codes:
-            dest = "auto"
-
-        return func(text, src, dest)
+        return func(text, lang_code(src), lang_code(dest))
 
     wrapper.__doc__ = func.__doc__
     wrapper.__name__ = func.__name__
@@ -185,6 +224,7 @@ def decor_unicodify(func):
 #------------------------------------------------------------------------------
 
 @decor_name_to_code
+@decor_cache(CACHE)
 @decor_unicodify
 def translate(text, src="en", dest="zh-TW"):
     """Return translated text for the given text supplied, matching the
@@ -211,24 +251,194 @@ def translate(text, src="en", dest="zh-TW"):
     >>> translate("A bird can fly high.", "en", "fr")
     u'Un oiseau peut voler haut.'
     """
-    URL_BASE = 'http://translate.google.com/translate_t'
-    urllib.FancyURLopener.version = "%s/%s" % (__file__, __version__)
+    result = PARSER.first(_post(text, src, dest))
+    if text and not result:
+        raise ValueError('empty result')    # never cached
+    return result
+
 
+def _post(text, src, dest):
+    """POST utf8 text to the web service and return the result page."""
     params = {
         'langpair': '%s|%s' % (src, dest),
         'text': text,
         'ie': 'UTF8',
         'oe': 'UTF8'
     }
-    data = urllib.urlencode(params)
+    return CLIENT.post('', params)
+
+
+class ResultParser(object):
+    """A parser of the result box of result pages; the patterns are
+    compiled once.
+
+    Example
+    -------
+    >>> page = ('<span id=result_box><span>Bonjour</span><br><span>Monde'
+    ...         '</span></span>')
+    >>> ResultParser().first(page), ResultParser().all(page)
+    ('Bonjour', 'Bonjour\\nMonde')
+    >>> ResultParser().all('<html></html>')
+    Traceback (most recent call last):
+    ...
+    ValueError: no result box
+    """
+
+    _FIRST = re.compile('<span.*?result_box.*?><span.*?>(.*?)</span>')
+    _BOX = re.compile('<span[^>]*result_box[^>]*>(.*?)</span></span>', re.S)
+    _BR = re.compile('(?i)<br\s*/?>')
+    _TAG = re.compile('<[^>]*>')
 
-    page = urllib.urlopen(URL_BASE, data)   # POST
-    content = page.read()
-    page.close()
+    def first(self, content):
+        """Return the first span of the result box."""
+        match = self._FIRST.search(content)
+        if match is None:
+            raise ValueError('no result box')
+        return match.group(1)
 
-    pattern = re.compile('<span.*?result_box.*?><span.*?>(.*?)</span>')
-    match = pattern.search(content)
-    return match.groups()[0]
+    def all(self, content):
+        """Return the text of all spans of the result box; line breaks are
+        kept.
+        """
+        match = self._BOX.search(content)
+        if match is None:
+            raise ValueError('no result box')
+        return self._TAG.sub('', self._BR.sub('\n', match.group(1)))
+
+
+PARSER = ResultParser()
+
+
+#------------------------------------------------------------------------------
+# Batched translation
+#------------------------------------------------------------------------------
+
+MAX_PAYLOAD = 4500      # the max. bytes of packed text per request
+
+_TAG = '[[%d]]'
+_TAG_PATTERN = re.compile(r'\[\[\s*(\d+)\s*\]\]')
+
+
+def pack(texts, limit=None):
+    """Pack utf8 texts into batches of index-tagged lines of at most limit
+    (MAX_PAYLOAD by default) bytes; yield (indices, packed text) per batch.
+
+    Texts too long for a batch, or with lines or tags of their own, are
+    yielded alone, untagged.
+
+    Example
+    -------
+    >>> list(pack(["Hello", "World", "A long line."], 24))
+    [([0, 1], '[[0]] Hello\\n[[1]] World'), ([2], '[[2]] A long line.')]
+    >>> list(pack(["Two\\nlines", "x" * 30], 24))
+    [([0], 'Two\\nlines'), ([1], 'xxxxxxxxxxxxxxxxxxxxxxxxxxxxxx')]
+    """
+    if limit is None:
+        limit = MAX_PAYLOAD
+    indices, lines, size = [], [], 0
+    for i, text in enumerate(texts):
+        line = '%s %s' % (_TAG % i, text)
+        if len(line) > limit or '\n' in text or _TAG_PATTERN.search(text):
+            yield [i], text
+            continue
+        if lines and size + 1 + len(line) > limit:
+            yield indices, '\n'.join(lines)
+            indices, lines, size = [], [], 0
+        indices.append(i)
+        lines.append(line)
+        size += len(line) + (size > 0)
+    if lines:
+        yield indices, '\n'.join(lines)
+
+
+def unpack(result, indices):
+    """Split the translation of a packed text back into a dict of
+    {index: utf8 text}.
+
+    Segments with lost, repeated or unknown tags are left out, and so are
+    those before repeated or unknown tags, which may hold a part of them.
+
+    Example
+    -------
+    >>> unpack('[[0]] Bonjour\\n[[ 1 ]] Monde', [0, 1])
+    {0: 'Bonjour', 1: 'Monde'}
+    >>> unpack('[[0]] Bonjour [[7]] Monde\\n[[1]] Au revoir', [0, 1])
+    {1: 'Au revoir'}
+    """
+    parts = _TAG_PATTERN.split(result)
+    expected = set(indices)
+    found = {}
+    bad = set()
+    prev = None
+    for k in xrange(1, len(parts), 2):
+        i = int(parts[k])
+        if i in found or i not in expected:
+            bad.update([i, prev])
+        found[i] = parts[k+1].strip()
+        prev = i
+    return dict((i, found[i]) for i in indices
+                if i in found and i not in bad)
+
+
+@decor_name_to_code
+def translate_many(texts, src="en", dest="zh-TW"):
+    """Return the list of translated texts of the given texts, in order.
+
+    Identical and cached texts are translated once; the others are packed
+    into as few requests as MAX_PAYLOAD allows (see pack). Segments that
+    cannot be split back from the result, or are empty, fall back to single
+    requests, which raise an error if they fail again. Requests are sent
+    concurrently by CLIENT.
+
+    Arguments
+    ---------
+    texts - The texts (str or unicode) that are to be translated.
+    src  - The source language as a language code or name
+    dest - The destination language as a language code or name
+
+    Example
+    -------
+    >>> translate_many(["Bonjour Monde", "Bonjour Monde", "Au revoir"],
+    ...                "fr", "en")
+    [u'Hello World', u'Hello World', u'Goodbye']
+    """
+    texts = [t.encode("utf8") if isinstance(t, unicode) else t
+             for t in texts]
+    results = {}
+    todo = []
+    for text in texts:
+        if text in results:
+            continue
+        results[text] = CACHE.get(text, src, dest)
+        if results[text] is None:
+            todo.append(text)
+
+    def request(batch):
+        indices, packed = batch
+        try:
+            result = PARSER.all(_post(packed, src, dest))
+        except (IOError, ValueError):
+            return {}
+        if packed == todo[indices[0]]:      # a text alone, untagged
+            return {indices[0]: result}
+        return unpack(result, indices)
+
+    batches = list(pack(todo))
+    failed = []
+    for (indices, packed), segments in zip(batches,
+                                           CLIENT.map(request, batches)):
+        for i in indices:
+            text = todo[i]
+            if segments.get(i) or (i in segments and not text):
+                results[text] = segments[i].decode("utf8")
+                CACHE.put(text, src, dest, results[text])
+            else:
+                failed.append(text)     # no result, or an empty one
+
+    single = CLIENT.map(lambda text: translate(text, src, dest), failed)
+    results.update(zip(failed, single))
+
+    return [results[text] for text in texts]
 
 
 #------------------------------------------------------------------------------
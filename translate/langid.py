@@ -0,0 +1,498 @@
+# -*- coding: utf-8 -*-
+"""
+A local language pre-classifier for glang.detect.
+
+Most texts are classified by their Unicode scripts alone, e.g., kana means
+Japanese, Hangul Korean and Thai Thai; Chinese is told traditional or
+simplified by characters of only one of them, and Latin texts are scored
+against character trigram profiles of a few languages. Only texts without
+a confident answer need the detect web service.
+
+It also resolves language names, codes and aliases to the language codes of
+the web services in one dict lookup (see lang_index).
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import re
+import math
+from bisect import bisect_right
+from collections import defaultdict
+
+
+#------------------------------------------------------------------------------
+# Scripts
+#------------------------------------------------------------------------------
+
+# (first code point, last code point, script) in order
+_SCRIPTS = [
+    (0x0041, 0x005A, 'Latin'),
+    (0x0061, 0x007A, 'Latin'),
+    (0x00C0, 0x024F, 'Latin'),
+    (0x0370, 0x03FF, 'Greek'),
+    (0x0400, 0x052F, 'Cyrillic'),
+    (0x0530, 0x058F, 'Armenian'),
+    (0x0590, 0x05FF, 'Hebrew'),
+    (0x0600, 0x06FF, 'Arabic'),
+    (0x0780, 0x07BF, 'Thaana'),
+    (0x0900, 0x097F, 'Devanagari'),
+    (0x0980, 0x09FF, 'Bengali'),
+    (0x0A00, 0x0A7F, 'Gurmukhi'),
+    (0x0A80, 0x0AFF, 'Gujarati'),
+    (0x0B00, 0x0B7F, 'Oriya'),
+    (0x0B80, 0x0BFF, 'Tamil'),
+    (0x0C00, 0x0C7F, 'Telugu'),
+    (0x0C80, 0x0CFF, 'Kannada'),
+    (0x0D00, 0x0D7F, 'Malayalam'),
+    (0x0D80, 0x0DFF, 'Sinhala'),
+    (0x0E00, 0x0E7F, 'Thai'),
+    (0x0E80, 0x0EFF, 'Lao'),
+    (0x0F00, 0x0FFF, 'Tibetan'),
+    (0x1000, 0x109F, 'Myanmar'),
+    (0x10A0, 0x10FF, 'Georgian'),
+    (0x1100, 0x11FF, 'Hangul'),
+    (0x1200, 0x139F, 'Ethiopic'),
+    (0x13A0, 0x13FF, 'Cherokee'),
+    (0x1400, 0x167F, 'Canadian'),
+    (0x1780, 0x17FF, 'Khmer'),
+    (0x1E00, 0x1EFF, 'Latin'),
+    (0x3040, 0x309F, 'Kana'),
+    (0x30A0, 0x30FF, 'Kana'),
+    (0x3130, 0x318F, 'Hangul'),
+    (0x31F0, 0x31FF, 'Kana'),
+    (0x3400, 0x4DBF, 'Han'),
+    (0x4E00, 0x9FFF, 'Han'),
+    (0xAC00, 0xD7AF, 'Hangul'),
+    (0xF900, 0xFAFF, 'Han'),
+    (0xFF66, 0xFF9F, 'Kana'),
+]
+_STARTS = [start for start, end, script in _SCRIPTS]
+
+# the scripts of only one supported language
+_SCRIPT_LANG = {
+    'Greek': 'el',
+    'Armenian': 'hy',
+    'Hebrew': 'iw',
+    'Thaana': 'dv',
+    'Bengali': 'bn',
+    'Gurmukhi': 'pa',
+    'Gujarati': 'gu',
+    'Oriya': 'or',
+    'Tamil': 'ta',
+    'Telugu': 'te',
+    'Kannada': 'kn',
+    'Malayalam': 'ml',
+    'Sinhala': 'si',
+    'Thai': 'th',
+    'Lao': 'lo',
+    'Tibetan': 'bo',
+    'Myanmar': 'my',
+    'Georgian': 'ka',
+    'Hangul': 'ko',
+    'Ethiopic': 'am',
+    'Cherokee': 'chr',
+    'Canadian': 'iu',
+    'Khmer': 'km',
+}
+
+# characters of only traditional or simplified Chinese; neither has forms of
+# Japanese (e.g., 会, 学, 国, 来 and 東), so Han-only Japanese is not guessed
+_TRADITIONAL = set(u'們來說國會對學麼發實經點從關體邊樣聽將麵歡讓賣當與舊'
+                   u'變錢號氣廣黃團應媽廳權滿')
+_SIMPLIFIED = set(u'这们说时对为过么还发动现实经问从关开长书门东车马见话'
+                  u'请语边样头电网听欢让给买卖变钟钱气热认识习广业团义应'
+                  u'几无爱妈厅权满')
+
+
+def script(ch):
+    """Return the script of a unicode character, or None if it is not a
+    letter of a known script.
+
+    Example
+    -------
+    >>> script(u'a'), script(u'\u3042'), script(u'1')
+    ('Latin', 'Kana', None)
+    """
+    cp = ord(ch)
+    i = bisect_right(_STARTS, cp) - 1
+    if i >= 0 and cp <= _SCRIPTS[i][1]:
+        return _SCRIPTS[i][2]
+    return None
+
+
+def script_counts(text):
+    """Return a dict of {script: the number of characters}."""
+    counts = defaultdict(int)
+    for ch in text:
+        s = script(ch)
+        if s:
+            counts[s] += 1
+    return counts
+
+
+#------------------------------------------------------------------------------
+# Latin trigram profiles
+#------------------------------------------------------------------------------
+
+# Article 1 of the Universal Declaration of Human Rights, and common words
+_SAMPLES = {
+    'en': u"""All human beings are born free and equal in dignity and rights.
+        They are endowed with reason and conscience and should act towards
+        one another in a spirit of brotherhood. the of and to in is that it
+        for was on with as you this have be at by not from or which what
+        there will would can all your when they their been has were more
+        about after again also always another any because before being
+        between both but could day does down each even every find first get
+        give good great here how just know last like little long make many
+        may most much must name need never new next no now number only other
+        our out over people right said same see should show since some still
+        such take than then these thing think those through time under until
+        use used very want way well where while who why work world year""",
+    'fr': u"""Tous les êtres humains naissent libres et égaux en dignité et en
+        droits. Ils sont doués de raison et de conscience et doivent agir les
+        uns envers les autres dans un esprit de fraternité. le la les de des
+        du et est une pour que qui dans pas sur avec vous nous ce cette être
+        avoir fait sont mais où comme plus tout aussi leur
+        alors après aussi autre avant avec beaucoup bien bon chaque chose
+        comment contre depuis dire donc elle encore entre faire heure ici
+        jamais jour leur lui maintenant même moins monde notre nouveau parce
+        peut peu plusieurs pourquoi premier quand quel rien sans selon
+        seulement sous toujours trop très voir votre année""",
+    'de': u"""Alle Menschen sind frei und gleich an Würde und Rechten geboren.
+        Sie sind mit Vernunft und Gewissen begabt und sollen einander im
+        Geist der Brüderlichkeit begegnen. der die das und ist nicht ein eine
+        zu mit sich auf für von dem den des auch es wir ich werden wird haben
+        sein über nach bei noch schön
+        aber alle also andere bitte dann darf dass dein diese dieser doch
+        dort durch eigentlich einem einen einer etwas gegen gehen gut heute
+        hier immer jetzt kann kein keine können machen mehr mein muss neue
+        nur oder ohne schon sehr sollte sondern unter viel vom vor wann warum
+        was weil wenn wer wie wieder wo zeit zum zur zwischen größe""",
+    'es': u"""Todos los seres humanos nacen libres e iguales en dignidad y
+        derechos y, dotados como están de razón y conciencia, deben
+        comportarse fraternalmente los unos con los otros. el la los las de
+        del que y en un una es por para con no se su al lo como más pero
+        muy también está hay ser este esta
+        ahora algo antes aquí así bien cada casi cuando cual cuanto desde
+        después donde dos ella ellos entre era eso estos favor fue hace
+        hasta hoy mismo mucho nada nos nuestro nuevo nunca otro parte poco
+        porque primero puede qué quien sin sobre solo también tiempo todo
+        tu usted vez ya año niño señor""",
+    'it': u"""Tutti gli esseri umani nascono liberi ed eguali in dignità e
+        diritti. Essi sono dotati di ragione e di coscienza e devono agire
+        gli uni verso gli altri in spirito di fratellanza. il lo la gli le
+        di del della che e è un una per con non sono questo questa anche
+        come più ma nel alla molto essere fatto
+        adesso allora altro ancora avere bene cosa così dopo dove era
+        essere fare già grande ha hanno ieri invece loro mai meno mio molto
+        nella nostro ogni oggi ora perché però poi prima proprio quale
+        quando quello qui sempre senza solo stato sua suo tempo troppo
+        tutto uno vostro città sarà""",
+    'pt': u"""Todos os seres humanos nascem livres e iguais em dignidade e em
+        direitos. Dotados de razão e de consciência, devem agir uns para com
+        os outros em espírito de fraternidade. o a os as de do da que e em
+        um uma é não para com por se mais mas como seu sua ele ela muito
+        também são está isso você
+        agora ainda antes aqui assim bem cada coisa depois desde dizer
+        dois então entre era essa esse estar eu fazer foi hoje isto lá
+        mesmo muito nada nem nosso novo nunca onde outro pela pelo pode
+        porque quando quem sem ser sobre só também tempo todo tudo vai vez
+        já ano ação informação""",
+    'nl': u"""Alle mensen worden vrij en gelijk in waardigheid en rechten
+        geboren. Zij zijn begiftigd met verstand en geweten, en behoren zich
+        jegens elkander in een geest van broederschap te gedragen. de het een
+        en van in is dat op te zijn met voor niet aan er ook als maar bij
+        nog wel naar heeft hebben wordt deze
+        achter al alles altijd andere bent dan daar deze die dit doen door
+        dus echter eerst eens geen goed haar hem hier hij hoe hun iets ik
+        jij kan kunnen later maken meer mij mijn moet niets nieuw nooit nu
+        of om omdat onder ons ook over veel voor waar wat wanneer we weer
+        welke werd wij zal ze zeer zo zonder""",
+    'af': u"""Alle menslike wesens word vry, met gelyke waardigheid en regte,
+        gebore. Hulle het rede en gewete en behoort in die gees van
+        broederskap teenoor mekaar op te tree. die en van in is dat nie het
+        te op vir met sy word as hy ons aan was by ek jy hulle om ook maar
+        sal kan nog moet al oor uit na daar hierdie wat geen meer baie wees
+        dit gaan kom sien weet goed groot waar wanneer hoekom hoe wie omdat
+        sonder tussen eers altyd niks iets gebruik begin asseblief tyd jaar
+        mense land kinders nuwe ander elke net dan toe wil gesê gedoen""",
+    'da': u"""Alle mennesker er født frie og lige i værdighed og rettigheder.
+        De er udstyret med fornuft og samvittighed, og de bør handle mod
+        hverandre i en broderskabets ånd. og i at det en den til er som på
+        de med han af for ikke der var mig sig men et har om vi min havde
+        ham hun nu over da fra du ud sin dem os op man hans hvor eller hvad
+        skal selv her alle vil blev kunne ind når være dog noget ville jo
+        deres efter ned skulle denne end dette mit også under have dig
+        anden hende mine alt meget sit sine vor mod disse hvis din nogle
+        hos blive mange bliver hendes været sådan hvordan hvorfor fordi""",
+    'no': u"""Alle mennesker er født frie og med samme menneskeverd og
+        menneskerettigheter. De er utstyrt med fornuft og samvittighet og
+        bør handle mot hverandre i brorskapets ånd. og i jeg det at en et
+        den til er som på de med han av ikke der så var meg seg men har om
+        vi min mitt ha hadde hun nå over da ved fra du ut sin dem oss opp
+        man kan hans hvor eller hva skal selv her alle vil bli ble blitt
+        kunne inn når være kom noen noe ville dere deres etter ned skulle
+        denne for deg si sine sitt mot meget hvorfor dette disse uten
+        hvordan ingen din ditt blir samme hver hvem hvis bare enn fordi før
+        mange også slik vært""",
+    'sv': u"""Alla människor är födda fria och lika i värde och rättigheter.
+        De har utrustats med förnuft och samvete och bör handla gentemot
+        varandra i en anda av broderskap. och det att i en jag hon som han
+        på den med var sig för så till är men ett om hade de av inte mig du
+        henne då sin nu har hans honom skulle hennes där min man vid kunde
+        något från ut när efter upp vi dem vara vad över än dig kan sina
+        här ha mot alla under någon eller allt mycket sedan denna själv
+        detta utan varit hur ingen mitt ni bli blev oss din dessa några
+        deras blir mina samma vilken sådan vår varför varje vem""",
+}
+
+_WORD = re.compile(r"[^\W\d_]+", re.U)
+_profiles = None
+
+
+def trigrams(text):
+    """Return the character trigrams of the words of a text, lowercased
+    and padded with spaces.
+
+    Example
+    -------
+    >>> trigrams(u'The cat')
+    [u' th', u'the', u'he ', u' ca', u'cat', u'at ']
+    """
+    grams = []
+    for word in _WORD.findall(text.lower()):
+        word = u' %s ' % word
+        grams.extend(word[i:i+3] for i in xrange(len(word) - 2))
+    return grams
+
+
+def _build_profiles():
+    """Return {lang: (log-probability dict, log-probability of unseen)}."""
+    profiles = {}
+    for lang, sample in _SAMPLES.iteritems():
+        counts = defaultdict(int)
+        for g in trigrams(sample):
+            counts[g] += 1
+        total = float(sum(counts.values()) + len(counts) + 1)
+        logp = dict((g, math.log((n + 1) / total))
+                    for g, n in counts.iteritems())
+        profiles[lang] = (logp, math.log(1 / total))
+    return profiles
+
+
+def score_latin(text):
+    """Return [(mean log-probability of a trigram, lang)] of a Latin text,
+    best first.
+    """
+    global _profiles
+    if _profiles is None:
+        _profiles = _build_profiles()
+    grams = trigrams(text)
+    scores = []
+    for lang, (logp, unseen) in _profiles.iteritems():
+        s = sum(logp.get(g, unseen) for g in grams)
+        scores.append((s / max(len(grams), 1), lang))
+    scores.sort(reverse=True)
+    return scores
+
+
+#------------------------------------------------------------------------------
+# Classifier
+#------------------------------------------------------------------------------
+
+# The profiles are small, so Latin texts are classified conservatively; the
+# Nordic and Afrikaans profiles mainly keep their texts from passing as Dutch
+# or German
+MIN_LATIN = 12          # the min. trigrams of a Latin text to classify
+MIN_MARGIN = 0.12       # the min. mean log-probability lead of the best
+MIN_COVERAGE = 0.5      # the min. ratio of trigrams seen in the best profile
+
+
+def classify(text):
+    """Return the language code of a text, or None if it is ambiguous.
+
+    Example
+    -------
+    >>> classify("ハローワールド"), classify("안녕하세요"), classify("สวัสดี")
+    ('ja', 'ko', 'th')
+    >>> classify("將麵和面一起服下肚"), classify("面皮")
+    ('zh-TW', None)
+    >>> [classify(s) for s in ("会員登録", "学生", "来週", "東京")]
+    [None, None, None, None]
+    >>> classify("Die Datei wurde nicht gefunden")
+    'de'
+
+    Texts of languages without a profile or a letter test are left to the
+    service:
+
+    >>> [classify(s) for s in ("Беларуская мова", "Қазақ тілі",
+    ...     "Кыргыз тилинде сүйлөйм", "Тоҷикӣ забон", "Монгол хэл үсэг")]
+    [None, None, None, None, None]
+    >>> classify("Беларусь знаходзіцца ў цэнтры Еўропы"), classify("Мы жили")
+    (None, 'ru')
+    >>> [classify(s) for s in ("Filen kunne ikke findes på serveren",
+    ...     "Filen kunne ikke finnes på serveren i dag",
+    ...     "Filen kunde inte hittas på servern")]
+    [None, None, None]
+    >>> classify("Die lêer kon nie op die bediener gevind word nie")
+    'af'
+    >>> classify("Hello") is None
+    True
+    """
+    if isinstance(text, str):
+        text = text.decode("utf8")
+    counts = script_counts(text)
+    if not counts:
+        return None
+    letters = sum(counts.values())
+    if counts.get('Kana'):
+        return 'ja'
+    main, n = max(counts.iteritems(), key=lambda (s, n): n)
+    if n < 0.8 * letters:
+        return None
+
+    if main in _SCRIPT_LANG:
+        return _SCRIPT_LANG[main]
+    if main == 'Han':
+        chars = set(text)
+        trad, simp = chars & _TRADITIONAL, chars & _SIMPLIFIED
+        if trad and not simp:
+            return 'zh-TW'
+        if simp and not trad:
+            return 'zh-CN'
+        return None
+    if main == 'Cyrillic':
+        if re.search(u'[ўқәғүұөңһҳҷӣӯјљњђћџЎҚӘҒҮҰӨҢҺҲҶӢӮЈЉЊЂЋЏ]', text):
+            return None         # Belarusian, Kazakh, Serbian, ...
+        uk = re.search(u'[іїєґІЇЄҐ]', text)
+        ru = re.search(u'[ыэёЫЭЁ]', text)
+        if uk and not ru:
+            return 'uk'
+        if ru and not uk:
+            return 'ru'
+        return None
+    if main == 'Arabic':
+        if re.search(u'[پچژگکی]', text):
+            return None         # Persian or Urdu
+        return 'ar'
+    if main == 'Latin':
+        grams = trigrams(text)
+        if len(grams) < MIN_LATIN:
+            return None
+        (best, lang), (second, _) = score_latin(text)[:2]
+        logp = _profiles[lang][0]
+        coverage = sum(g in logp for g in grams) / float(len(grams))
+        if lang not in ('da', 'no', 'sv') and re.search(u'[æøåÆØÅ]', text):
+            return None
+        if best - second >= MIN_MARGIN and coverage >= MIN_COVERAGE:
+            return lang
+    return None
+
+
+#------------------------------------------------------------------------------
+# Language resolution
+#------------------------------------------------------------------------------
+
+# other codes of languages -> the codes of the web services
+LANG_ALIASES = {
+    'he': 'iw',
+    'fil': 'tl',
+    'nb': 'no',
+    'pt': 'pt-PT',
+    'zh-Hans': 'zh-CN',
+    'zh-Hant': 'zh-TW',
+    'zh-HK': 'zh-TW',
+    'zh-SG': 'zh-CN',
+}
+
+
+def lang_key(lang):
+    """Return the normalized key of a language name or code.
+
+    Example
+    -------
+    >>> lang_key(" chinese-traditional"), lang_key("zh_tw")
+    ('CHINESE_TRADITIONAL', 'ZH_TW')
+    """
+    return lang.strip().upper().replace('-', '_').replace(' ', '_')
+
+
+def lang_index(lang_code, aliases=LANG_ALIASES):
+    """Return a dict of language names, codes and aliases to codes, from a
+    dict of upper-case names to codes.
+
+    The names and codes are keyed as given, as title-case names, and by
+    lang_key; look a language up as is first, then by lang_key.
+
+    Example
+    -------
+    >>> index = lang_index({'ENGLISH': 'en', 'TAIWAN': 'zh-TW',
+    ...                     'CHINESE_TRADITIONAL': 'zh-TW'})
+    >>> index['English'], index['zh-TW'], index[lang_key('Zh_Hant')]
+    ('en', 'zh-TW', 'zh-TW')
+    """
+    index = {}
+    codes = set(lang_code.values())
+    for alias, code in aliases.iteritems():
+        if code in codes:
+            index[alias] = index[lang_key(alias)] = code
+    for code in codes:
+        index[code] = index[lang_key(code)] = code
+    for name, code in lang_code.iteritems():
+        index[name] = index[name.title()] = index[lang_key(name)] = code
+    return index
+
+
+#------------------------------------------------------------------------------
+# Decorators
+#------------------------------------------------------------------------------
+
+def decor_classify(cache):
+    """Return a decorator that answers func(text) of a detect web service
+    by classify (as unicode codes, like JSON results), or else from a cache,
+    and caches the results of func.
+
+    The numbers of local answers and calls of func are counted in the
+    attributes local and remote of the decorated function.
+
+    Example
+    -------
+    >>> from tcache import TranslationCache
+    >>> @decor_classify(TranslationCache())
+    ... def detect(text):
+    ...     return u'en'
+    >>> detect("Hello"), detect("Hello"), detect("안녕하세요")
+    (u'en', u'en', u'ko')
+    >>> detect.local, detect.remote
+    (1, 1)
+    """
+    def decor(func):
+        def wrapper(text):
+            lang = classify(text)
+            if lang is not None:
+                wrapper.local += 1
+                return unicode(lang)
+            lang = cache.get(text, '', '')
+            if lang is None:
+                lang = func(text)
+                wrapper.remote += 1
+                if lang is not None:
+                    cache.put(text, '', '', lang)
+            return lang
+
+        wrapper.__doc__ = func.__doc__
+        wrapper.__name__ = func.__name__
+        wrapper.cache = cache
+        wrapper.local = wrapper.remote = 0
+        return wrapper
+    return decor
+
+
+#------------------------------------------------------------------------------
+# Module Testing
+#------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+"""
+Translate resource files -- gettext PO, JSON and YAML -- by gtrans.py or
+glang.py.
+
+Entries are streamed from a resource file; those already translated (a
+non-empty msgstr of PO, or a key of an existing output file) are skipped.
+Identical source strings are translated once, in batches of
+translate_many. Each batch is appended to a checkpoint journal as it is
+done, so a run stopped halfway resumes where it was, and the output file
+is written when all entries are translated.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import os
+import sys
+import json
+import getopt
+from collections import OrderedDict
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+def _utf8(s):
+    """Return s as a utf8 string."""
+    if isinstance(s, unicode):
+        return s.encode("utf8")
+    return s
+
+
+#------------------------------------------------------------------------------
+# PO files
+#------------------------------------------------------------------------------
+
+_PO_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+
+
+def po_unquote(line):
+    """Return the string of a quoted line of a PO file.
+
+    Example
+    -------
+    >>> po_unquote(r'"Say \\"hi\\"\\n"')
+    'Say "hi"\\n'
+    """
+    s = line.strip()[1:-1]
+    out = []
+    i = 0
+    while i < len(s):
+        if s[i] == '\\' and i + 1 < len(s):
+            out.append(_PO_ESCAPES.get(s[i+1], s[i+1]))
+            i += 2
+        else:
+            out.append(s[i])
+            i += 1
+    return ''.join(out)
+
+
+def po_quote(keyword, s):
+    """Return the lines of a keyword and a string of a PO file; strings of
+    many lines are split after line breaks.
+
+    Example
+    -------
+    >>> po_quote('msgstr', 'Hello')
+    ['msgstr "Hello"']
+    >>> po_quote('msgstr', 'a\\nb')
+    ['msgstr ""', '"a\\\\n"', '"b"']
+    """
+    s = s.replace('\\', '\\\\').replace('"', '\\"').replace('\t', '\\t')
+    parts = s.split('\n')
+    parts = [p + '\\n' for p in parts[:-1]] + [parts[-1]]
+    if len(parts) == 1:
+        return ['%s "%s"' % (keyword, parts[0])]
+    return ['%s ""' % keyword] + ['"%s"' % p for p in parts if p]
+
+
+class POEntry(object):
+    """An entry of a PO file: its lines, and the strings of its keywords,
+    e.g., msgid, msgid_plural, msgstr and msgstr[1].
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.fields = OrderedDict()     # keyword -> string
+        self.spans = {}                 # keyword -> (first, last+1) line
+
+    def get(self, keyword, default=''):
+        return self.fields.get(keyword, default)
+
+    def msgstrs(self):
+        """Return the msgstr keywords of the entry."""
+        return [k for k in self.fields if k.startswith('msgstr')]
+
+    def sources(self):
+        """Return [(msgstr keyword, source string)] of the entry; plural
+        forms but the first are translated from msgid_plural.
+        """
+        plural = self.get('msgid_plural', None)
+        return [(k, plural if plural is not None and k != 'msgstr[0]'
+                 else self.get('msgid'))
+                for k in self.msgstrs()]
+
+    def is_header(self):
+        return self.get('msgid', None) == ''
+
+    def is_translated(self):
+        return all(self.fields[k] for k in self.msgstrs())
+
+    def text(self, translations=None):
+        """Return the text of the entry with msgstrs replaced by
+        translations, a dict of {keyword: string}.
+        """
+        lines = list(self.lines)
+        for k, (a, b) in sorted(self.spans.items(), key=lambda x: -x[1][0]):
+            if translations and k in translations:
+                lines[a:b] = po_quote(k, translations[k])
+        return ''.join(line + '\n' for line in lines)
+
+
+def iter_po(path):
+    """Yield the POEntry objects of a PO file; blank lines between entries
+    are kept in the lines of the next entry.
+
+    Example
+    -------
+    >>> import StringIO
+    >>> f = StringIO.StringIO('msgid "Hello"\\nmsgstr ""\\n\\n'
+    ...                       'msgid ""\\n"Wor"\\n"ld"\\nmsgstr "Monde"\\n')
+    >>> [(e.get('msgid'), e.is_translated()) for e in iter_po(f)]
+    [('Hello', False), ('World', True)]
+    """
+    f = open(path) if isinstance(path, basestring) else path
+    entry = POEntry()
+    keyword = None
+    for line in f:
+        line = line.rstrip('\r\n')
+        s = line.strip()
+        if not s or (s.startswith('#') and entry.fields):
+            if entry.fields:
+                yield entry
+                entry, keyword = POEntry(), None
+        if s.startswith('"') and keyword:
+            entry.fields[keyword] += po_unquote(s)
+            entry.spans[keyword] = (entry.spans[keyword][0],
+                                    len(entry.lines) + 1)
+        elif s and not s.startswith('#'):
+            keyword, _, rest = s.partition(' ')
+            entry.fields[keyword] = po_unquote(rest)
+            entry.spans[keyword] = (len(entry.lines), len(entry.lines) + 1)
+        entry.lines.append(line)
+    if entry.fields or entry.lines:
+        yield entry
+    if f is not path:
+        f.close()
+
+
+#------------------------------------------------------------------------------
+# JSON and YAML files
+#------------------------------------------------------------------------------
+
+def flatten(tree, prefix=()):
+    """Yield (key path, string) of the strings of nested dicts.
+
+    Example
+    -------
+    >>> list(flatten({'menu': {'open': 'Open'}}))
+    [(('menu', 'open'), 'Open')]
+    """
+    for k, v in tree.iteritems():
+        if isinstance(v, dict):
+            for item in flatten(v, prefix + (k,)):
+                yield item
+        elif isinstance(v, basestring):
+            yield prefix + (k,), v
+
+
+def lookup(tree, keys):
+    """Return the value of a key path of nested dicts, or None."""
+    for k in keys:
+        if not isinstance(tree, dict) or k not in tree:
+            return None
+        tree = tree[k]
+    return tree
+
+
+def assign(tree, keys, value):
+    """Set the value of a key path of nested dicts."""
+    for k in keys[:-1]:
+        tree = tree.setdefault(k, OrderedDict())
+    tree[keys[-1]] = value
+
+
+if yaml is not None:
+    class _YamlLoader(yaml.SafeLoader):
+        """A safe YAML loader of mappings as OrderedDicts."""
+
+    class _YamlDumper(yaml.SafeDumper):
+        """A safe YAML dumper of OrderedDicts in their order."""
+
+    def _construct_ordered(loader, node):
+        loader.flatten_mapping(node)
+        return OrderedDict(loader.construct_pairs(node, deep=True))
+
+    def _represent_ordered(dumper, tree):
+        # a list of pairs is never sorted, unlike a dict
+        return dumper.represent_mapping(u'tag:yaml.org,2002:map',
+                                        tree.items())
+
+    _YamlLoader.add_constructor(
+        yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _construct_ordered)
+    _YamlDumper.add_representer(OrderedDict, _represent_ordered)
+
+
+def load_tree(path, format):
+    """Return the nested OrderedDicts of a JSON or YAML file."""
+    f = open(path)
+    try:
+        if format == 'json':
+            return json.load(f, object_pairs_hook=OrderedDict)
+        if yaml is None:
+            raise ImportError('YAML files need PyYAML')
+        return yaml.load(f, Loader=_YamlLoader) or OrderedDict()
+    finally:
+        f.close()
+
+
+def dump_tree(tree, f, format):
+    """Write nested dicts as a JSON or YAML file, in the order of keys."""
+    if format == 'json':
+        text = json.dumps(tree, indent=2, ensure_ascii=False,
+                          separators=(',', ': '))
+        f.write(_utf8(text) + '\n')
+    else:
+        yaml.dump(tree, f, Dumper=_YamlDumper, allow_unicode=True,
+                  default_flow_style=False, encoding='utf-8')
+
+
+#------------------------------------------------------------------------------
+# Checkpoints
+#------------------------------------------------------------------------------
+
+class Journal(object):
+    """A checkpoint journal of translations: one JSON [source, translation]
+    per line, appended and flushed per batch.
+
+    A line cut by a crash, and all after it, are truncated on opening, so
+    new lines are appended after the last good one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            good = 0
+            f = open(path, 'rb')
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    source, target = json.loads(line)
+                except ValueError:
+                    break       # a line cut by a crash
+                self.done[_utf8(source)] = _utf8(target)
+                good += len(line)
+            f.close()
+            if good < os.path.getsize(path):
+                f = open(path, 'r+b')
+                f.truncate(good)
+                f.close()
+        self.f = None
+
+    def add(self, pairs):
+        """Record [(source, translation)] of a batch."""
+        if self.f is None:
+            self.f = open(self.path, 'a')
+        for source, target in pairs:
+            self.done[source] = target
+            self.f.write(json.dumps([source.decode("utf8"),
+                                     target.decode("utf8")]) + '\n')
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def remove(self):
+        if self.f:
+            self.f.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+#------------------------------------------------------------------------------
+# Pipeline
+#------------------------------------------------------------------------------
+
+FORMATS = {'.po': 'po', '.pot': 'po', '.json': 'json', '.yaml': 'yaml',
+           '.yml': 'yaml'}
+
+
+def resource_format(path):
+    """Return the format of a resource file by its extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError('unknown resource format: %s' % path)
+    return FORMATS[ext]
+
+
+def output_path(path, dest):
+    """Return the default output path, e.g., ui.zh-TW.json for ui.json.
+
+    Example
+    -------
+    >>> output_path('po/ui.pot', 'fr')
+    'po/ui.fr.po'
+    """
+    base, ext = os.path.splitext(path)
+    if ext.lower() == '.pot':
+        ext = '.po'
+    return '%s.%s%s' % (base, dest, ext)
+
+
+def iter_sources(path, out, format):
+    """Yield the utf8 source strings of the untranslated entries of a
+    resource file.
+    """
+    if format == 'po':
+        for entry in iter_po(path):
+            if entry.fields and not entry.is_header():
+                for keyword, source in entry.sources():
+                    if source and not entry.fields[keyword]:
+                        yield source
+    else:
+        done = load_tree(out, format) if os.path.exists(out) else {}
+        for keys, source in flatten(load_tree(path, format)):
+            if source and not lookup(done, keys):
+                yield _utf8(source)
+
+
+def write_output(path, out, format, done):
+    """Write the translated resource file out of path, by the dict of
+    {source: translation} done; it replaces out at once when complete.
+    """
+    tmp = out + '.tmp'
+    f = open(tmp, 'wb')
+    if format == 'po':
+        for entry in iter_po(path):
+            trans = {}
+            for keyword, source in entry.sources():
+                if source in done and not entry.fields[keyword] and \
+                   not entry.is_header():
+                    trans[keyword] = done[source]
+            f.write(entry.text(trans))
+    else:
+        tree = load_tree(path, format)
+        old = load_tree(out, format) if os.path.exists(out) else {}
+        for keys, source in list(flatten(tree)):
+            s = _utf8(source)
+            if lookup(old, keys):
+                assign(tree, keys, lookup(old, keys))
+            elif s in done:
+                assign(tree, keys, done[s].decode("utf8"))
+        dump_tree(tree, f, format)
+    f.close()
+    if os.path.exists(out):
+        os.remove(out)
+    os.rename(tmp, out)
+
+
+def translate_resource(path, src, dest, out=None, batch=200, engine=None):
+    """Translate a resource file into out (see output_path by default) and
+    return (the number of strings translated, the number of requests of
+    translate_many).
+
+    Arguments
+    ---------
+    path    the PO, JSON or YAML file
+    src     the source language
+    dest    the destination language
+    out     the output file; it is also the input of translations done by
+            earlier runs of JSON and YAML files
+    batch   the max. number of distinct strings per translate_many call
+    engine  a translate_many(texts, src, dest) function; that of gtrans.py
+            by default
+
+    The checkpoint journal is out + '.ckpt'; it is removed when out is
+    written.
+    """
+    if engine is None:
+        from gtrans import translate_many as engine
+    format = resource_format(path)
+    if out is None:
+        out = output_path(path, dest)
+    journal = Journal(out + '.ckpt')
+
+    pending = []
+    seen = set()
+    calls = 0
+
+    def flush():
+        targets = [_utf8(t) for t in engine(pending, src, dest)]
+        journal.add(zip(pending, targets))
+        del pending[:]
+
+    for source in iter_sources(path, out, format):
+        if source in seen or source in journal.done:
+            continue
+        seen.add(source)
+        pending.append(source)
+        if len(pending) >= batch:
+            flush()
+            calls += 1
+    if pending:
+        flush()
+        calls += 1
+
+    write_output(path, out, format, journal.done)
+    count = len(journal.done)
+    journal.remove()
+    return count, calls
+
+
+#------------------------------------------------------------------------------
+
+def usage():
+    print """\
+Usage: rtrans [option] FILE...
+
+Option:
+    -s LANG, --src=LANG     the source language (English is the default).
+    -d LANG, --dest=LANG    the destination language (Taiwan is the
+                            default).
+    -o FILE, --output=FILE  the output file of a single input file
+                            (<base>.<dest>.<ext> is the default).
+    -b N, --batch=N         the max. distinct strings per batch (200 is the
+                            default).
+    -e NAME, --engine=NAME  gtrans (the default) or glang.
+    -u URL, --url=URL       the URL of the web service of the engine.
+    --cache=FILE            keep translations in a cache file too, e.g.,
+                            trans.db.
+    -h, --help              show this help message and exit.
+
+Purpose:
+    Translate the untranslated entries of gettext PO, JSON and YAML
+    resource files. A stopped run resumes from its checkpoint file,
+    <output>.ckpt."""
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    else:
+        args = args.split()
+    try:
+        opts, args = getopt.getopt(args, "hs:d:o:b:e:u:",
+                                   ["help", "src=", "dest=", "output=",
+                                    "batch=", "engine=", "url=",
+                                    "cache="])
+    except getopt.GetoptError, err:
+        print str(err)
+        usage()
+        return 2
+
+    if args == []:
+        usage()
+        return 0
+
+    src, dest, out, batch = "English", "Taiwan", None, 200
+    engine, url, cache = "gtrans", None, None
+    for o, a in opts:
+        if o in ("-s", "--src"):
+            src = a
+        elif o in ("-d", "--dest"):
+            dest = a
+        elif o in ("-o", "--output"):
+            out = a
+        elif o in ("-b", "--batch"):
+            batch = int(a)
+        elif o in ("-e", "--engine"):
+            engine = a
+        elif o in ("-u", "--url"):
+            url = a
+        elif o == "--cache":
+            cache = a
+        elif o in ("-h", "--help"):
+            usage()
+            return 0
+        else:
+            assert False, "unhandled option"
+
+    if out and len(args) > 1:
+        print "--output needs a single input file"
+        return 2
+
+    module = __import__(engine)
+    if url:
+        module.configure(url)
+    if cache:
+        module.CACHE.open(cache)
+    code = module.lang_code(dest) or dest
+    for path in args:
+        target = out or output_path(path, code)
+        count, calls = translate_resource(path, src, dest, target, batch,
+                                          module.translate_many)
+        print "%s: %d strings in %d batches" % (target, count, calls)
+    if cache:
+        module.CACHE.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
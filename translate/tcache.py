@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+A cache of translations for gtrans.py and glang.py.
+
+Translations are keyed by (text, src, dest). Recent ones are kept in an
+in-process LRU of limited size and age; all are optionally kept in an
+on-disk store (sqlite, or dbm) that survives processes, so repeated strings
+of UI localization batches never go to the web service twice.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import time
+import atexit
+import threading
+from collections import OrderedDict
+
+
+def _utf8(s):
+    """Return s as a utf8 string."""
+    if isinstance(s, unicode):
+        return s.encode("utf8")
+    return s
+
+
+def _unicode(s):
+    """Return s as a unicode string."""
+    if isinstance(s, str):
+        return s.decode("utf8")
+    return s
+
+
+#------------------------------------------------------------------------------
+# Persistent stores
+#------------------------------------------------------------------------------
+
+class SqliteStore(object):
+    """A store of (text, src, dest) -> (value, time) in a sqlite file."""
+
+    def __init__(self, path):
+        import sqlite3
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS trans (
+            text TEXT, src TEXT, dest TEXT, value TEXT, time REAL,
+            PRIMARY KEY (text, src, dest))""")
+        self.db.commit()
+
+    def get(self, key):
+        row = self.db.execute("SELECT value, time FROM trans "
+                              "WHERE text=? AND src=? AND dest=?",
+                              map(_unicode, key)).fetchone()
+        return row
+
+    def put(self, key, value, stamp):
+        self.db.execute("INSERT OR REPLACE INTO trans VALUES (?, ?, ?, ?, ?)",
+                        map(_unicode, key) + [_unicode(value), stamp])
+
+    def sync(self):
+        self.db.commit()
+
+    def clear(self):
+        self.db.execute("DELETE FROM trans")
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+class DbmStore(object):
+    """A store of (text, src, dest) -> (value, time) in a dbm file
+    (anydbm picks the best dbm module available).
+    """
+
+    def __init__(self, path):
+        import anydbm
+        self.db = anydbm.open(path, 'c')
+
+    def get(self, key):
+        k = '\0'.join(map(_utf8, key))
+        if not self.db.has_key(k):
+            return None
+        stamp, value = self.db[k].split('\0', 1)
+        return value.decode("utf8"), float(stamp)
+
+    def put(self, key, value, stamp):
+        self.db['\0'.join(map(_utf8, key))] = '%r\0%s' % (stamp, _utf8(value))
+
+    def sync(self):
+        if hasattr(self.db, 'sync'):
+            self.db.sync()
+
+    def clear(self):
+        for k in self.db.keys():
+            del self.db[k]
+        self.sync()
+
+    def close(self):
+        self.db.close()
+
+
+def open_store(path):
+    """Open a persistent store: sqlite for *.db, *.sqlite and *.sqlite3
+    files, dbm for others.
+    """
+    if path.lower().endswith(('.db', '.sqlite', '.sqlite3')):
+        return SqliteStore(path)
+    return DbmStore(path)
+
+
+#------------------------------------------------------------------------------
+# Cache
+#------------------------------------------------------------------------------
+
+class TranslationCache(object):
+    """An LRU cache of translations keyed by (text, src, dest).
+
+    Arguments
+    ---------
+    maxsize     the max. number of translations kept in memory; 0 disables
+                the memory cache
+    ttl         the max. age of translations in seconds, or None to keep them
+                forever; older ones are translated again
+    path        the file of a persistent store (see open_store), or None
+
+    Texts are keyed as utf8 strings, so str and unicode texts share entries.
+    A cache is thread-safe. Puts to the store are flushed every 100 puts and
+    on close, which is also called at the exit of the interpreter.
+
+    Example
+    -------
+    >>> cache = TranslationCache(maxsize=2)
+    >>> cache.put("Hello", "en", "fr", u"Bonjour")
+    >>> cache.get(u"Hello", "en", "fr"), cache.get("Hello", "en", "de")
+    (u'Bonjour', None)
+    >>> cache.put("a", "en", "fr", u"A"); cache.put("b", "en", "fr", u"B")
+    >>> cache.get("Hello", "en", "fr") is None     # the least recently used
+    True
+    >>> cache.stats()['hits'], cache.stats()['misses'], len(cache)
+    (1, 2, 2)
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, path=None, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._lru = OrderedDict()       # key -> (value, time)
+        self._lock = threading.Lock()
+        self.store = None
+        self._at_exit = False
+        self.reset_stats()
+        if path:
+            self.open(path)
+
+    def open(self, path):
+        """Back the cache with a persistent store in path."""
+        self.close()
+        self.store = open_store(path)
+        if not self._at_exit:
+            atexit.register(self.close)
+            self._at_exit = True
+
+    def close(self):
+        """Flush and close the persistent store, if any."""
+        with self._lock:
+            if self.store:
+                self.store.close()
+                self.store = None
+
+    def __len__(self):
+        return len(self._lru)
+
+    def _fresh(self, stamp):
+        return self.ttl is None or self.clock() - stamp < self.ttl
+
+    def _remember(self, key, value, stamp):
+        if self.maxsize <= 0:
+            return
+        self._lru.pop(key, None)
+        self._lru[key] = (value, stamp)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, text, src, dest):
+        """Return the cached translation, or None."""
+        key = (_utf8(text), _utf8(src), _utf8(dest))
+        with self._lock:
+            entry = self._lru.pop(key, None)
+            if entry and self._fresh(entry[1]):
+                self._lru[key] = entry          # the most recently used
+                self.hits += 1
+                return entry[0]
+            if entry:
+                self.expirations += 1
+            if self.store:
+                entry = self.store.get(key)
+                if entry and self._fresh(entry[1]):
+                    self._remember(key, entry[0], entry[1])
+                    self.store_hits += 1
+                    return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, text, src, dest, value):
+        """Cache a translation."""
+        key = (_utf8(text), _utf8(src), _utf8(dest))
+        with self._lock:
+            stamp = self.clock()
+            self._remember(key, value, stamp)
+            if self.store:
+                self.store.put(key, value, stamp)
+                self.puts += 1
+                if self.puts % 100 == 0:
+                    self.store.sync()
+
+    def sync(self):
+        """Flush the persistent store."""
+        with self._lock:
+            if self.store:
+                self.store.sync()
+
+    def clear(self):
+        """Drop all translations, including those of the persistent store."""
+        with self._lock:
+            self._lru.clear()
+            if self.store:
+                self.store.clear()
+
+    def reset_stats(self):
+        self.hits = self.store_hits = self.misses = 0
+        self.expirations = self.evictions = self.puts = 0
+
+    def stats(self):
+        """Return a dict of hit/miss statistics.
+
+        hits and store_hits are the lookups answered by the memory and the
+        persistent store; misses are those that needed the web service.
+        """
+        lookups = self.hits + self.store_hits + self.misses
+        return {
+            'hits': self.hits,
+            'store_hits': self.store_hits,
+            'misses': self.misses,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+            'size': len(self._lru),
+            'hit_rate': (lookups - self.misses) / float(lookups or 1),
+        }
+
+
+#------------------------------------------------------------------------------
+# Decorators
+#------------------------------------------------------------------------------
+
+def decor_cache(cache):
+    """Return a decorator that answers func(text, src, dest) from a cache,
+    and caches the results of func.
+
+    Apply it inside a decorator that converts language names into codes, so
+    the names and the codes of a language share entries.
+
+    Example
+    -------
+    >>> calls = []
+    >>> @decor_cache(TranslationCache())
+    ... def upper(text, src, dest):
+    ...     calls.append(text)
+    ...     return text.upper()
+    >>> upper("abc", "en", "en"), upper("abc", "en", "en"), calls
+    ('ABC', 'ABC', ['abc'])
+    """
+    def decor(func):
+        def wrapper(text, src, dest):
+            value = cache.get(text, src, dest)
+            if value is None:
+                value = func(text, src, dest)
+                if value is not None:
+                    cache.put(text, src, dest, value)
+            return value
+
+        wrapper.__doc__ = func.__doc__
+        wrapper.__name__ = func.__name__
+        wrapper.cache = cache
+        return wrapper
+    return decor
+
+
+#------------------------------------------------------------------------------
+# Module Testing
+#------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+A concurrent HTTP client of translation web services for gtrans.py and
+glang.py.
+
+Requests go through a pool of persistent (keep-alive) connections to one
+base URL, which can be a local stand-in server for tests and benchmarks.
+The number of requests in flight is limited by the number of workers, the
+rate of requests by a token bucket, and failed requests (429, 5xx, broken
+connections) are retried with exponential backoff. Redirects within the
+host are followed as urllib2 does.
+"""
+__author__ = "Jiang Yu-Kuan, yukuan.jiang(at)gmail.com"
+__date__ = "2026/10/19 (initial version)"
+__version__ = "1.0"
+
+import time
+import socket
+import urllib
+import httplib
+import urlparse
+import threading
+import Queue
+
+
+class HTTPError(IOError):
+    """An HTTP error status, or a request that failed all its retries."""
+
+    def __init__(self, status, reason):
+        IOError.__init__(self, '(%s) %s' % (status, reason))
+        self.status = status
+
+
+class TokenBucket(object):
+    """A thread-safe token bucket of rate tokens per second holding at most
+    burst tokens.
+
+    Example
+    -------
+    >>> t = [0.]
+    >>> tb = TokenBucket(2, 2, clock=lambda: t[0])
+    >>> tb.acquire(), tb.acquire(), tb.acquire()    # the delays to wait
+    (0.0, 0.0, 0.5)
+    """
+
+    def __init__(self, rate, burst=1, clock=time.time):
+        self.rate = float(rate)
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.stamp = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token; return the delay until it is available, which the
+        caller should sleep.
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.
+            return -self.tokens / self.rate
+
+
+class Client(object):
+    """A pooled, rate-limited and retrying HTTP client of a base URL.
+
+    Arguments
+    ---------
+    base_url    the URL of the web service, e.g., http://127.0.0.1:8000/t
+    workers     the max. number of requests in flight (and of connections)
+    rate        the max. requests per second, or None for no limit
+    burst       the max. requests in a burst of the rate limit
+    retries     the max. retries of a request on 429, 5xx and broken
+                connections
+    backoff     the delay of the first retry in seconds; it doubles per retry
+    timeout     the socket timeout in seconds
+    agent       the User-Agent header
+    """
+
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    REDIRECT_STATUS = (301, 302, 303, 307, 308)
+    MAX_REDIRECTS = 5
+
+    def __init__(self, base_url, workers=4, rate=None, burst=1, retries=4,
+                 backoff=0.5, timeout=30, agent=None):
+        url = urlparse.urlsplit(base_url)
+        self.scheme = url.scheme
+        self.host = url.netloc
+        self.path = url.path or '/'
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = {'User-Agent': agent or 'tclient/%s' % __version__}
+        self._pool = Queue.LifoQueue()
+        self._slots = threading.Semaphore(workers)
+        self._lock = threading.Lock()
+        self.requests = self.retried = self.connects = 0
+
+    def _connect(self):
+        cls = httplib.HTTPSConnection if self.scheme == 'https' else \
+              httplib.HTTPConnection
+        with self._lock:
+            self.connects += 1
+        return cls(self.host, timeout=self.timeout)
+
+    def close(self):
+        """Close the pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except Queue.Empty:
+                break
+
+    def _send(self, method, path, body, headers):
+        """Send a request on a pooled connection; return (status, reason,
+        retry-after, location, data).
+        """
+        try:
+            conn = self._pool.get_nowait()
+            reused = True
+        except Queue.Empty:
+            conn = self._connect()
+            reused = False
+        try:
+            conn.request(method, path, body, headers)
+            res = conn.getresponse()
+            data = res.read()
+        except (httplib.HTTPException, socket.error):
+            conn.close()
+            if not reused:
+                raise
+            # the server closed the idle connection; reconnect once
+            conn = self._connect()
+            try:
+                conn.request(method, path, body, headers)
+                res = conn.getresponse()
+                data = res.read()
+            except:
+                conn.close()
+                raise
+        if res.will_close:
+            conn.close()
+        else:
+            self._pool.put(conn)
+        return (res.status, res.reason, res.getheader('Retry-After'),
+                res.getheader('Location'), data)
+
+    def _redirect(self, status, location, method, path, body, headers):
+        """Return (method, path, body) of the request that follows a redirect
+        to location; a POST redirected by 301, 302 or 303 becomes a GET, as
+        urllib2 does. Raise HTTPError for a redirect to another host.
+        """
+        base = '%s://%s%s' % (self.scheme, self.host, path)
+        url = urlparse.urlsplit(urlparse.urljoin(base, location or ''))
+        if not location or (url.scheme, url.netloc) != (self.scheme,
+                                                        self.host):
+            raise HTTPError(status, 'cannot redirect to %r' % location)
+        path = urlparse.urlunsplit(('', '', url.path or '/', url.query, ''))
+        if method == 'POST' and status in (301, 302, 303):
+            headers.pop('Content-Type', None)
+            return 'GET', path, None
+        return method, path, body
+
+    def request(self, method='GET', path='', params=None):
+        """Return the body of a response to a request of base URL + path
+        with urlencoded params; raise HTTPError if it fails.
+        """
+        path = self.path + path
+        body = None
+        headers = dict(self.headers)
+        if params is not None:
+            query = urllib.urlencode(params)
+            if method == 'GET':
+                path = '%s?%s' % (path, query)
+            else:
+                body = query
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        attempt = redirects = 0
+        with self._slots:
+            while True:
+                if self.bucket:
+                    time.sleep(self.bucket.acquire())
+                with self._lock:
+                    self.requests += 1
+                    self.retried += attempt > 0
+                delay = self.backoff * 2**attempt
+                try:
+                    status, reason, after, location, data = self._send(
+                        method, path, body, headers)
+                except (httplib.HTTPException, socket.error), err:
+                    status, reason = 0, str(err)
+                else:
+                    if status < 300:
+                        return data
+                    if status in self.REDIRECT_STATUS and \
+                       redirects < self.MAX_REDIRECTS:
+                        redirects += 1
+                        method, path, body = self._redirect(
+                            status, location, method, path, body, headers)
+                        continue
+                    if status not in self.RETRY_STATUS:
+                        raise HTTPError(status, reason)
+                    if after and after.isdigit():
+                        delay = max(delay, int(after))
+                if attempt >= self.retries:
+                    raise HTTPError(status, reason)
+                time.sleep(delay)
+                attempt += 1
+
+    def get(self, path='', params=None):
+        return self.request('GET', path, params)
+
+    def post(self, path='', params=None):
+        return self.request('POST', path, params)
+
+    def map(self, func, items):
+        """Return [func(item) for item in items], in order, called by as
+        many threads as workers.
+
+        The first exception raised by func is raised again after all items
+        are done.
+
+        Example
+        -------
+        >>> Client('http://localhost/', workers=3).map(abs, [-3, 1, -2])
+        [3, 1, 2]
+        """
+        items = list(items)
+        results = [None] * len(items)
+        errors = []
+        todo = Queue.Queue()
+        for i in xrange(len(items)):
+            todo.put(i)
+
+        def work():
+            while True:
+                try:
+                    i = todo.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[i] = func(items[i])
+                except Exception, err:
+                    errors.append((i, err))
+
+        threads = [threading.Thread(target=work)
+                   for _ in xrange(min(self.workers, len(items)))]
+        for t in threads:
+            t.daemon = True
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise min(errors)[1]
+        return results
+
+    def stats(self):
+        """Return a dict of the numbers of requests, retries and connects."""
+        return {'requests': self.requests, 'retries': self.retried,
+                'connects': self.connects}
+
+
+#------------------------------------------------------------------------------
+# Module Testing
+#------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()